@@ -2,32 +2,327 @@ import pygame
 import random
 import math
 import time
-from dataclasses import dataclass
-from typing import Tuple, List, Optional
 import json
+import numpy as np
+import multiprocessing
+from PIL import Image
+import sys
+from collections import deque
 
-@dataclass
-class Particle:
-    x: float
-    y: float
-    vx: float
-    vy: float
-    size: float
-    color: Tuple[int, int, int]
-    lifetime: float
-    particle_type: str = "circle"
+class ParticleSystem:
+    """Pool de partículas em arrays NumPy (structure-of-arrays)"""
+    
+    def __init__(self, capacity=2048, gravity=0.05, max_lifetime=60, seed=None, budget=None):
+        self.capacity = capacity
+        self.budget = min(budget or capacity, capacity)  # Máximo de partículas vivas
+        self.gravity = gravity
+        self.max_lifetime = max_lifetime
+        self.rng = np.random.default_rng(seed)
+        
+        # Partículas vivas ocupam sempre [0:count], da mais antiga para a mais nova
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), dtype=np.float32)
+        self.vel = np.zeros((capacity, 2), dtype=np.float32)
+        self.size = np.zeros(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.lifetime = np.zeros(capacity, dtype=np.float32)
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        """Remove todas as partículas"""
+        self.count = 0
+    
+    def emit(self, x, y, amount, color):
+        """Adiciona um lote de partículas saindo de (x, y)"""
+        amount = min(amount, self.budget)
+        if amount <= 0:
+            return 0
+        
+        # Orçamento estourado: descartar as mais antigas (início dos arrays)
+        overflow = self.count + amount - self.budget
+        if overflow > 0:
+            self.evict_oldest(overflow)
+        
+        start, end = self.count, self.count + amount
+        angle = self.rng.uniform(0, 2 * math.pi, amount)
+        speed = self.rng.uniform(1, 3, amount)
+        
+        self.pos[start:end] = (x, y)
+        self.vel[start:end, 0] = np.cos(angle) * speed
+        self.vel[start:end, 1] = np.sin(angle) * speed
+        self.size[start:end] = self.rng.uniform(2, 5, amount)
+        self.color[start:end] = color[:3]
+        self.lifetime[start:end] = self.rng.uniform(30, 60, amount)
+        
+        self.count = end
+        return amount
+    
+    def evict_oldest(self, amount):
+        """Remove as `amount` partículas mais antigas"""
+        amount = min(amount, self.count)
+        remaining = self.count - amount
+        for array in (self.pos, self.vel, self.size, self.color, self.lifetime):
+            array[:remaining] = array[amount:self.count]
+        self.count = remaining
+    
+    def step(self):
+        """Integra posição, gravidade e tempo de vida; descarta partículas mortas"""
+        n = self.count
+        if n == 0:
+            return
+        
+        self.pos[:n] += self.vel[:n]
+        self.vel[:n, 1] += self.gravity  # Gravidade leve
+        self.lifetime[:n] -= 1
+        
+        alive = self.lifetime[:n] > 0
+        alive_count = int(np.count_nonzero(alive))
+        if alive_count < n:
+            # Compactar mantendo a ordem de criação
+            for array in (self.pos, self.vel, self.size, self.color, self.lifetime):
+                array[:alive_count] = array[:n][alive]
+            self.count = alive_count
+    
+    def bounds(self):
+        """Retângulo que envolve todas as partículas vivas (ou None)"""
+        n = self.count
+        if n == 0:
+            return None
+        
+        margin = int(self.size[:n].max()) + 2
+        x_min, y_min = self.pos[:n].min(axis=0)
+        x_max, y_max = self.pos[:n].max(axis=0)
+        return pygame.Rect(
+            int(x_min) - margin,
+            int(y_min) - margin,
+            int(x_max - x_min) + margin * 2 + 1,
+            int(y_max - y_min) + margin * 2 + 1
+        )
+    
+    def draw(self, surface):
+        """Desenha partículas vivas na superfície"""
+        n = self.count
+        if n == 0:
+            return
+        
+        xs = self.pos[:n, 0].astype(np.int32).tolist()
+        ys = self.pos[:n, 1].astype(np.int32).tolist()
+        sizes = self.size[:n].astype(np.int32).tolist()
+        alphas = (255 * (self.lifetime[:n] / self.max_lifetime)).astype(np.int32).tolist()
+        colors = self.color[:n].tolist()
+        
+        draw_circle = pygame.draw.circle
+        for x, y, size, alpha, (r, g, b) in zip(xs, ys, sizes, alphas, colors):
+            draw_circle(surface, (r, g, b, alpha), (x, y), size)
+
+class AnimationCommands:
+    """Canal de comandos para a animação (deque: append/popleft atômicos, sem locks)"""
+    
+    SET_EMOTION = "set_emotion"
+    SET_LOVE = "set_love"
+    BURST = "burst"
+    PAUSE = "pause"
+    RESUME = "resume"
+    STOP = "stop"
+    
+    def __init__(self, maxlen=256):
+        self.queue = deque(maxlen=maxlen)
+    
+    def send(self, command, *args):
+        """Enfileira comando (seguro para qualquer thread)"""
+        self.queue.append((command, args))
+    
+    def drain(self):
+        """Retira todos os comandos pendentes"""
+        commands = []
+        while True:
+            try:
+                commands.append(self.queue.popleft())
+            except IndexError:
+                return commands
+    
+    def clear(self):
+        """Descarta comandos pendentes"""
+        self.queue.clear()
+    
+    def set_emotion(self, emotion):
+        self.send(self.SET_EMOTION, emotion)
+    
+    def set_love(self, level):
+        self.send(self.SET_LOVE, level)
+    
+    def burst(self, x=None, y=None, emotion=None, count=1):
+        self.send(self.BURST, x, y, emotion, count)
+    
+    def pause(self):
+        self.send(self.PAUSE)
+    
+    def resume(self):
+        self.send(self.RESUME)
+    
+    def stop(self):
+        self.send(self.STOP)
+
+class SharedAnimationState:
+    """Estado da animação em memória compartilhada (emoção, amor, posição)"""
+    
+    EMOTIONS = ["neutral", "happy", "sad", "love", "excited", "thinking", "angry"]
+    EMOTION, LOVE, X, Y, FRAMES = range(5)
+    
+    def __init__(self, context=None):
+        context = context or multiprocessing
+        self.values = context.RawArray('d', 5)
+        self.values[self.LOVE] = 50
+    
+    @property
+    def emotion(self):
+        index = int(self.values[self.EMOTION])
+        return self.EMOTIONS[index] if 0 <= index < len(self.EMOTIONS) else None
+    
+    @emotion.setter
+    def emotion(self, emotion):
+        if emotion in self.EMOTIONS:
+            self.values[self.EMOTION] = self.EMOTIONS.index(emotion)
+    
+    @property
+    def love_level(self):
+        return self.values[self.LOVE]
+    
+    @love_level.setter
+    def love_level(self, level):
+        self.values[self.LOVE] = level
+    
+    @property
+    def position(self):
+        return self.values[self.X], self.values[self.Y]
+    
+    @property
+    def frames(self):
+        return int(self.values[self.FRAMES])
+    
+    def publish(self, x, y):
+        """Chamado pela animação a cada quadro"""
+        self.values[self.X] = x
+        self.values[self.Y] = y
+        self.values[self.FRAMES] += 1
+
+class PipeCommands(AnimationCommands):
+    """Canal de comandos entre processos: comandos pelo pipe, emoção pela memória compartilhada"""
+    
+    def __init__(self, connection, state=None):
+        self.connection = connection
+        self.state = state
+    
+    def send(self, command, *args):
+        try:
+            self.connection.send((command, args))
+        except (BrokenPipeError, EOFError, OSError):
+            pass  # Processo de animação já terminou
+    
+    def drain(self):
+        commands = []
+        try:
+            while self.connection.poll():
+                commands.append(self.connection.recv())
+        except (EOFError, OSError):
+            # Processo principal sumiu: encerrar animação
+            commands.append((self.STOP, ()))
+        return commands
+    
+    def clear(self):
+        self.drain()
+    
+    def set_emotion(self, emotion):
+        if self.state is not None and emotion in self.state.EMOTIONS:
+            self.state.emotion = emotion
+        else:
+            self.send(self.SET_EMOTION, emotion)
+    
+    def set_love(self, level):
+        if self.state is not None:
+            self.state.love_level = level
+        else:
+            self.send(self.SET_LOVE, level)
+
+def run_animation_process(width, height, connection, state, emotion):
+    """Ponto de entrada do processo de animação"""
+    animation = LunaAnimation(
+        width, height,
+        commands=PipeCommands(connection),
+        shared_state=state
+    )
+    animation.update_emotion(emotion)
+    animation.run()
+
+class AnimationProcess:
+    """Executa LunaAnimation em processo próprio (fora do GIL do Tk)"""
+    
+    def __init__(self, width=400, height=400):
+        self.width = width
+        self.height = height
+        self.context = multiprocessing.get_context("spawn")
+        self.process = None
+        self.state = None
+        self.commands = None
+    
+    def start(self, emotion="neutral", love_level=50):
+        """Cria o processo, a memória compartilhada e o pipe de comandos"""
+        parent_connection, child_connection = self.context.Pipe()
+        self.state = SharedAnimationState(self.context)
+        self.state.emotion = emotion
+        self.state.love_level = love_level
+        self.commands = PipeCommands(parent_connection, self.state)
+        
+        self.process = self.context.Process(
+            target=run_animation_process,
+            args=(self.width, self.height, child_connection, self.state, emotion),
+            daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+        return self.commands
+    
+    def is_alive(self):
+        return self.process is not None and self.process.is_alive()
+    
+    def stop(self, timeout=2):
+        """Pede para o processo encerrar; força se não responder"""
+        if not self.process:
+            return
+        
+        self.commands.stop()
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
 
 class LunaAnimation:
-    def __init__(self, width=800, height=600):
+    def __init__(self, width=800, height=600, max_particles=2048, commands=None, shared_state=None,
+                 embedded=False):
         pygame.init()
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height), pygame.SRCALPHA)
-        pygame.display.set_caption("Luna - Assistente Virtual")
+        self.embedded = embedded
+        if embedded:
+            # Superfície fora da tela com bytes em ordem R, G, B, X (lida direto pelo PIL)
+            if sys.byteorder == "little":
+                masks = (0x000000FF, 0x0000FF00, 0x00FF0000, 0)
+            else:
+                masks = (0xFF000000, 0x00FF0000, 0x0000FF00, 0)
+            self.screen = pygame.Surface((width, height), 0, 32, masks)
+        else:
+            self.screen = pygame.display.set_mode((width, height), pygame.SRCALPHA)
+            pygame.display.set_caption("Luna - Assistente Virtual")
         
         self.clock = pygame.time.Clock()
         self.running = True
-        self.particles = []
+        self.paused = False
+        self.commands = commands if commands is not None else AnimationCommands()
+        self.shared_state = shared_state
+        self.love_level = 50
+        self.particles = ParticleSystem(capacity=max_particles)
         self.luna_x = width // 2
         self.luna_y = height // 2
         self.luna_size = 50
@@ -37,6 +332,19 @@ class LunaAnimation:
         self.mouse_interaction = True
         self.auto_animations = True
         
+        # Renderização: "dirty" atualiza só retângulos alterados, "full" redesenha tudo
+        self.render_mode = "dirty"
+        self.background = (25, 25, 40)
+        self.previous_rects = []
+        self.full_redraw = True
+        
+        # Taxa de quadros adaptativa
+        self.active_fps = 60
+        self.idle_fps = 10
+        self.idle_delay = 5.0  # Segundos sem atividade até entrar em repouso
+        self.last_activity = time.time()
+        self.frame_scale = 1.0
+        
         # Estados emocionais
         self.emotion_colors = {
             "happy": (255, 255, 150),
@@ -47,6 +355,12 @@ class LunaAnimation:
             "thinking": (200, 230, 255)
         }
         
+        # Atlas de sprites da gota: (cor, boca, fase, piscada) -> Surface
+        self.atlas_phases = 32
+        self.gota_atlas = {}
+        self.atlas_signature = None
+        self.invalidate_atlas()
+        
         # Carregar configurações
         self.load_config()
     
@@ -56,11 +370,19 @@ class LunaAnimation:
                 config = json.load(f)
                 self.mouse_interaction = config['animation']['mouse_interaction']
                 self.auto_animations = config['animation']['auto_animations']
+                self.render_mode = config['animation'].get('render_mode', self.render_mode)
+                self.idle_fps = config['animation'].get('idle_fps', self.idle_fps)
+                self.particles.budget = min(
+                    config['animation'].get('max_particles', self.particles.budget),
+                    self.particles.capacity
+                )
         except:
             pass
     
     def update_emotion(self, emotion: str):
         """Atualiza emoção atual"""
+        if emotion != self.emotion:
+            self.mark_activity()
         self.emotion = emotion
         if emotion in self.emotion_colors:
             self.luna_color = self.emotion_colors[emotion]
@@ -82,142 +404,180 @@ class LunaAnimation:
         
         color = color_map.get(emotion, (255, 255, 255, 100))
         
-        for _ in range(random.randint(3, 8)):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 3)
-            vx = math.cos(angle) * speed
-            vy = math.sin(angle) * speed
-            
-            self.particles.append(
-                Particle(
-                    x=x,
-                    y=y,
-                    vx=vx,
-                    vy=vy,
-                    size=random.uniform(2, 5),
-                    color=color,
-                    lifetime=random.uniform(30, 60)
-                )
-            )
+        self.particles.emit(x, y, random.randint(3, 8), color)
     
-    def draw_luna_gota(self):
-        """Desenha Luna no formato de gota animada"""
-        self.luna_pulse += 0.05
+    def invalidate_atlas(self):
+        """Descarta sprites pré-renderizados (tamanho ou paleta mudaram)"""
+        self.gota_atlas = {}
+        self.atlas_signature = (self.luna_size, tuple(sorted(self.emotion_colors.items())))
+    
+    def set_luna_size(self, size):
+        """Altera tamanho da Luna e reconstrói o atlas"""
+        self.luna_size = size
+        self.invalidate_atlas()
+    
+    def set_emotion_colors(self, colors):
+        """Altera paleta de emoções e reconstrói o atlas"""
+        self.emotion_colors.update(colors)
+        if self.emotion in self.emotion_colors:
+            self.luna_color = self.emotion_colors[self.emotion]
+        self.invalidate_atlas()
+    
+    def gota_extent(self):
+        """Meia largura do sprite da gota (raio máximo + borda)"""
+        return int(self.luna_size * 1.1) + 4
+    
+    def render_gota_sprite(self, color, phase, mouth, blink):
+        """Renderiza a gota numa superfície própria para o atlas"""
+        half = self.gota_extent()
+        sprite = pygame.Surface((half * 2, half * 2), pygame.SRCALPHA)
+        cx = cy = half
         
         # Base da gota
         points = []
         for i in range(36):
             angle = (i / 36) * 2 * math.pi
-            radius = self.luna_size * (1 + 0.1 * math.sin(self.luna_pulse + i * 0.2))
+            radius = self.luna_size * (1 + 0.1 * math.sin(phase + i * 0.2))
             
             # Formato de gota (mais estreito na parte superior)
             if i < 18:
                 radius *= 0.8
             
-            x = self.luna_x + radius * math.cos(angle)
-            y = self.luna_y + radius * math.sin(angle)
+            x = cx + radius * math.cos(angle)
+            y = cy + radius * math.sin(angle)
             points.append((x, y))
         
         # Desenhar gota com gradiente
         for i in range(len(points)):
             pygame.draw.line(
-                self.screen,
-                self.luna_color,
+                sprite,
+                color,
                 points[i],
                 points[(i + 1) % len(points)],
                 3
             )
         
-        # Preencher gota
-        if len(points) >= 3:
-            pygame.draw.polygon(
-                self.screen,
-                (*self.luna_color, 150),  # Com transparência
-                points
-            )
+        # Preencher gota (opaca: na tela sem canal alfa o alfa 150 era ignorado)
+        pygame.draw.polygon(
+            sprite,
+            (*color, 255),
+            points
+        )
         
         # Olhos animados
         eye_offset = self.luna_size * 0.3
         eye_size = self.luna_size * 0.1
         
-        left_eye_x = self.luna_x - eye_offset
-        right_eye_x = self.luna_x + eye_offset
-        eye_y = self.luna_y - eye_offset * 0.5
-        
-        # Piscar ocasionalmente
-        blink = 1
-        if random.random() < 0.002:  # 0.2% chance de piscar por frame
-            blink = 0.1
+        left_eye_x = cx - eye_offset
+        right_eye_x = cx + eye_offset
+        eye_y = cy - eye_offset * 0.5
         
         pygame.draw.circle(
-            self.screen,
+            sprite,
             (0, 0, 0),
             (int(left_eye_x), int(eye_y)),
             int(eye_size * blink)
         )
         pygame.draw.circle(
-            self.screen,
+            sprite,
             (0, 0, 0),
             (int(right_eye_x), int(eye_y)),
             int(eye_size * blink)
         )
         
         # Boca baseada na emoção
-        mouth_y = self.luna_y + eye_offset * 0.5
-        if self.emotion == "happy":
+        mouth_y = cy + eye_offset * 0.5
+        if mouth == "happy":
             pygame.draw.arc(
-                self.screen,
+                sprite,
                 (0, 0, 0),
-                (self.luna_x - eye_offset, mouth_y - eye_size, 
+                (cx - eye_offset, mouth_y - eye_size,
                  eye_offset * 2, eye_size * 2),
                 0, math.pi,
                 2
             )
-        elif self.emotion == "love":
+        elif mouth == "love":
             # Coração pequeno
             heart_size = eye_size
             pygame.draw.polygon(
-                self.screen,
+                sprite,
                 (255, 105, 180),
                 [
-                    (self.luna_x, mouth_y),
-                    (self.luna_x - heart_size, mouth_y - heart_size),
-                    (self.luna_x - heart_size * 0.5, mouth_y - heart_size * 1.5),
-                    (self.luna_x, mouth_y - heart_size),
-                    (self.luna_x + heart_size * 0.5, mouth_y - heart_size * 1.5),
-                    (self.luna_x + heart_size, mouth_y - heart_size),
+                    (cx, mouth_y),
+                    (cx - heart_size, mouth_y - heart_size),
+                    (cx - heart_size * 0.5, mouth_y - heart_size * 1.5),
+                    (cx, mouth_y - heart_size),
+                    (cx + heart_size * 0.5, mouth_y - heart_size * 1.5),
+                    (cx + heart_size, mouth_y - heart_size),
                 ]
             )
+        
+        return sprite
+    
+    def get_gota_sprite(self, blink):
+        """Busca (ou cria sob demanda) o sprite da fase de pulso atual"""
+        signature = (self.luna_size, tuple(sorted(self.emotion_colors.items())))
+        if signature != self.atlas_signature:
+            self.invalidate_atlas()
+        
+        phase_index = int(self.luna_pulse / (2 * math.pi) * self.atlas_phases) % self.atlas_phases
+        mouth = self.emotion if self.emotion in ("happy", "love") else None
+        key = (self.luna_color, mouth, phase_index, blink)
+        
+        sprite = self.gota_atlas.get(key)
+        if sprite is None:
+            phase = phase_index * 2 * math.pi / self.atlas_phases
+            sprite = self.render_gota_sprite(self.luna_color, phase, mouth, blink)
+            self.gota_atlas[key] = sprite
+        return sprite
+    
+    def build_atlas(self):
+        """Pré-renderiza todas as emoções, fases e variações de olhos"""
+        for emotion, color in self.emotion_colors.items():
+            mouth = emotion if emotion in ("happy", "love") else None
+            for phase_index in range(self.atlas_phases):
+                phase = phase_index * 2 * math.pi / self.atlas_phases
+                for blink in (1, 0.1):
+                    key = (color, mouth, phase_index, blink)
+                    if key not in self.gota_atlas:
+                        self.gota_atlas[key] = self.render_gota_sprite(color, phase, mouth, blink)
+    
+    def draw_luna_gota(self):
+        """Desenha Luna no formato de gota animada"""
+        self.luna_pulse += 0.05 * self.frame_scale
+        
+        # Piscar ocasionalmente
+        blink = 1
+        if random.random() < 0.002:  # 0.2% chance de piscar por frame
+            blink = 0.1
+        
+        sprite = self.get_gota_sprite(blink)
+        half = self.gota_extent()
+        return self.screen.blit(sprite, (int(self.luna_x) - half, int(self.luna_y) - half))
     
     def draw_particles(self):
         """Desenha e atualiza partículas"""
-        new_particles = []
-        for p in self.particles:
-            p.x += p.vx
-            p.y += p.vy
-            p.vy += 0.05  # Gravidade leve
-            p.lifetime -= 1
-            
-            if p.lifetime > 0:
-                new_particles.append(p)
-                
-                # Desenhar partícula
-                alpha = int(255 * (p.lifetime / 60))
-                if p.particle_type == "circle":
-                    pygame.draw.circle(
-                        self.screen,
-                        (*p.color[:3], alpha),
-                        (int(p.x), int(p.y)),
-                        int(p.size)
-                    )
-        
-        self.particles = new_particles
+        self.particles.step()
+        self.particles.draw(self.screen)
+        return self.particles.bounds()
+    
+    def mark_activity(self):
+        """Registra atividade (mouse, emoção) e volta à taxa de quadros cheia"""
+        self.last_activity = time.time()
+    
+    def is_idle(self):
+        """Sem partículas, sem mouse e sem troca de emoção recentes"""
+        return (
+            len(self.particles) == 0
+            and time.time() - self.last_activity > self.idle_delay
+        )
     
     def handle_mouse(self, pos):
         """Interação com mouse"""
         if not self.mouse_interaction:
             return
         
+        self.mark_activity()
         mouse_x, mouse_y = pos
         distance = math.sqrt((mouse_x - self.luna_x)**2 + (mouse_y - self.luna_y)**2)
         
@@ -234,11 +594,21 @@ class LunaAnimation:
     
     def update(self):
         """Atualiza animação"""
-        self.screen.fill((25, 25, 40, 0))  # Fundo escuro semi-transparente
+        idle = self.is_idle()
+        self.frame_scale = self.active_fps / self.idle_fps if idle else 1.0
+        
+        dirty = self.render_mode == "dirty" and not self.full_redraw
+        if dirty:
+            # Apagar apenas o que foi desenhado no quadro anterior
+            for rect in self.previous_rects:
+                self.screen.fill(self.background, rect)
+        else:
+            self.screen.fill((25, 25, 40, 0))  # Fundo escuro semi-transparente
         
-        # Animações automáticas
+        # Animações automáticas (partículas ambiente só fora do repouso)
         if self.auto_animations:
-            if random.random() < 0.01:
+            # Mais afeto, mais partículas (0.01 por quadro no nível base)
+            if not idle and random.random() < 0.01 * (0.5 + self.love_level / 100):
                 self.create_particle(emotion=self.emotion)
             
             # Movimento suave aleatório
@@ -250,24 +620,112 @@ class LunaAnimation:
             self.luna_y = max(self.luna_size, min(self.height - self.luna_size, self.luna_y))
         
         # Desenhar elementos
-        self.draw_particles()
-        self.draw_luna_gota()
+        rects = [
+            rect for rect in (self.draw_particles(), self.draw_luna_gota())
+            if rect is not None
+        ]
+        
+        if self.embedded:
+            # Quem apresenta o quadro (e dita o ritmo) é a interface
+            self.full_redraw = False
+            self.previous_rects = rects
+            return rects
+        
+        if dirty:
+            pygame.display.update(self.previous_rects + rects)
+        else:
+            pygame.display.flip()
+            self.full_redraw = False
+        self.previous_rects = rects
+        
+        if idle:
+            # Ritmo dado por wait_events; só atualiza a referência do relógio
+            self.clock.tick()
+        else:
+            self.clock.tick(self.active_fps)
+    
+    def frame_image(self):
+        """Quadro atual como imagem PIL RGBX apontando para o buffer da superfície
+        
+        A superfície fica travada enquanto a imagem existir: descarte-a antes do próximo update.
+        """
+        return Image.frombuffer(
+            "RGBX",
+            (self.width, self.height),
+            self.screen.get_buffer(),
+            "raw",
+            "RGBX",
+            self.screen.get_pitch(),
+            1
+        )
+    
+    def process_commands(self):
+        """Aplica comandos recebidos de outras threads (uma vez por quadro)"""
+        for command, args in self.commands.drain():
+            if command == AnimationCommands.SET_EMOTION:
+                self.update_emotion(*args)
+            elif command == AnimationCommands.SET_LOVE:
+                self.love_level = args[0]
+            elif command == AnimationCommands.BURST:
+                x, y, emotion, count = args
+                for _ in range(count):
+                    self.create_particle(x, y, emotion)
+                self.mark_activity()
+            elif command == AnimationCommands.PAUSE:
+                self.paused = True
+            elif command == AnimationCommands.RESUME:
+                self.paused = False
+                self.full_redraw = True
+                self.mark_activity()
+            elif command == AnimationCommands.STOP:
+                self.running = False
         
-        pygame.display.flip()
-        self.clock.tick(60)
+        if self.shared_state is not None:
+            self.sync_shared_state()
+    
+    def sync_shared_state(self):
+        """Lê emoção/amor e publica posição na memória compartilhada"""
+        emotion = self.shared_state.emotion
+        if emotion and emotion != self.emotion:
+            self.update_emotion(emotion)
+        self.love_level = self.shared_state.love_level
+        self.shared_state.publish(self.luna_x, self.luna_y)
+    
+    def wait_events(self):
+        """Coleta eventos; em repouso bloqueia até um evento ou o próximo quadro lento"""
+        if self.paused:
+            event = pygame.event.wait(100)
+            events = [] if event.type == pygame.NOEVENT else [event]
+            return events + pygame.event.get()
+        
+        if not self.is_idle():
+            return pygame.event.get()
+        
+        event = pygame.event.wait(int(1000 / self.idle_fps))
+        events = [] if event.type == pygame.NOEVENT else [event]
+        return events + pygame.event.get()
     
     def run(self):
         """Loop principal da animação"""
         while self.running:
-            for event in pygame.event.get():
+            mouse_pos = None
+            for event in self.wait_events():
                 if event.type == pygame.QUIT:
                     self.running = False
                 elif event.type == pygame.MOUSEMOTION:
-                    self.handle_mouse(event.pos)
+                    # Agrupar movimentos: só a última posição do quadro importa
+                    mouse_pos = event.pos
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         self.running = False
+                elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    self.full_redraw = True
+            
+            if mouse_pos is not None:
+                self.handle_mouse(mouse_pos)
             
-            self.update()
+            self.process_commands()
+            if self.running and not self.paused:
+                self.update()
         
         pygame.quit()
\ No newline at end of file
@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import threading
+
+class Journal:
+    """Diário de alterações (write-ahead) sobre um snapshot JSON
+    
+    Cada alteração vira uma linha JSON anexada ao diário. Uma thread grava as
+    linhas pendentes em grupo, com no máximo um fsync a cada `commit_interval`
+    segundos, e compacta o diário num novo snapshot quando ele passa de
+    `compact_bytes`. As operações "set"/"delete" levam o valor completo e são
+    idempotentes; "append" acumula eventos, que o consumidor deve deduplicar
+    (por exemplo, por número de sequência), pois reaplicar registros já
+    presentes no snapshot é esperado.
+    """
+    
+    def __init__(self, snapshot_file, journal_file=None, commit_interval=0.2, compact_bytes=1024 * 1024):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file or os.path.splitext(snapshot_file)[0] + '.journal'
+        self.commit_interval = commit_interval
+        self.compact_bytes = compact_bytes
+        
+        self.snapshot_provider = None
+        self.pending = []
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.file = None
+        self.committed_bytes = 0
+        
+        # Estatísticas
+        self.records = 0
+        self.commits = 0
+        self.compactions = 0
+        self.replayed = 0
+    
+    @staticmethod
+    def apply(state, record):
+        """Aplica um registro ao estado (dicionários aninhados)"""
+        *parents, key = record['path']
+        target = state
+        for name in parents:
+            target = target.setdefault(name, {})
+        
+        if record['op'] == 'set':
+            target[key] = record['value']
+        elif record['op'] == 'delete':
+            target.pop(key, None)
+        elif record['op'] == 'append':
+            target.setdefault(key, []).append(record['value'])
+    
+    def load(self):
+        """Recuperação: snapshot + registros do diário; linha final incompleta é descartada"""
+        state = {}
+        if os.path.exists(self.snapshot_file):
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        
+        valid_bytes = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break  # Gravação interrompida no meio
+                    try:
+                        self.apply(state, json.loads(line))
+                    except (ValueError, KeyError):
+                        break
+                    valid_bytes += len(line)
+                    self.replayed += 1
+            
+            # Cortar o lixo para os próximos registros começarem numa linha limpa
+            if valid_bytes < os.path.getsize(self.journal_file):
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        
+        self.committed_bytes = valid_bytes
+        return state
+    
+    def start(self, snapshot_provider):
+        """Abre o diário e inicia a thread de gravação/compactação"""
+        self.snapshot_provider = snapshot_provider
+        self.file = open(self.journal_file, 'ab')
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def set(self, path, value):
+        self.append({'op': 'set', 'path': path, 'value': value})
+    
+    def delete(self, path):
+        self.append({'op': 'delete', 'path': path})
+    
+    def append_event(self, path, value):
+        """Acrescenta a uma lista (quem consome deve ignorar eventos repetidos)"""
+        self.append({'op': 'append', 'path': path, 'value': value})
+    
+    def append(self, record):
+        """Registra alteração (serializada já, para não pegar mutações posteriores)"""
+        record['ts'] = time.time()
+        line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+        with self.lock:
+            self.pending.append(line)
+            self.records += 1
+    
+    def commit(self):
+        """Grava o lote pendente com um único fsync"""
+        with self.lock:
+            self.commit_locked()
+    
+    def commit_locked(self):
+        if not self.pending or self.file is None:
+            return
+        data = b''.join(self.pending)
+        self.pending = []
+        self.file.write(data)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.committed_bytes += len(data)
+        self.commits += 1
+    
+    def write_snapshot(self, data):
+        """Grava snapshot de forma atômica (temporário + fsync + rename)"""
+        temp_file = self.snapshot_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.snapshot_file)
+    
+    def reset(self, data):
+        """Recomeça com `data` como snapshot e diário vazio (antes de start)"""
+        # Diário primeiro: se cair no meio, não sobra registro velho para reaplicar
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.committed_bytes = 0
+        self.write_snapshot(data)
+    
+    def compact(self):
+        """Novo snapshot; do diário sobra só o que chegou durante a serialização"""
+        with self.lock:
+            self.commit_locked()
+            mark = self.committed_bytes
+        
+        # Serializar fora do lock: quem altera só espera pelo corte da cauda
+        for _ in range(3):
+            try:
+                self.write_snapshot(self.snapshot_provider())
+                break
+            except RuntimeError:
+                continue  # Dicionário alterado durante a serialização
+        else:
+            return
+        
+        with self.lock:
+            self.commit_locked()
+            with open(self.journal_file, 'rb') as f:
+                f.seek(mark)
+                tail = f.read()
+            
+            temp_file = self.journal_file + '.tmp'
+            with open(temp_file, 'wb') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            self.file.close()
+            os.replace(temp_file, self.journal_file)
+            self.file = open(self.journal_file, 'ab')
+            self.committed_bytes = len(tail)
+            self.compactions += 1
+    
+    def run(self):
+        """Loop de gravação em grupo e compactação"""
+        while self.running:
+            self.wakeup.wait(self.commit_interval)
+            self.wakeup.clear()
+            try:
+                self.commit()
+                if self.committed_bytes > self.compact_bytes:
+                    self.compact()
+            except Exception as e:
+                print(f"❌ Erro no diário do banco de dados: {e}")
+    
+    def close(self):
+        """Grava o pendente, compacta e fecha"""
+        if not self.running:
+            return
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.compact()
+        self.file.close()
+        self.file = None
+    
+    def get_stats(self):
+        return {
+            'records': self.records,
+            'pending': len(self.pending),
+            'commits': self.commits,
+            'compactions': self.compactions,
+            'replayed': self.replayed,
+            'journal_bytes': self.committed_bytes
+        }
@@ -0,0 +1,243 @@
+import sys
+import sqlite3
+import threading
+from datetime import datetime
+
+def to_epoch(value):
+    """Timestamp em segundos (aceita ISO-8601 de bancos antigos)"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+def to_iso(epoch):
+    """ISO-8601 só na exportação"""
+    return datetime.fromtimestamp(epoch).isoformat() if epoch is not None else None
+
+class ProfileRecord:
+    """Base dos perfis: colunas em __slots__, timestamps em epoch, ids internados"""
+    
+    __slots__ = ()
+    COLUMNS = ()
+    TIMESTAMPS = ()
+    EXPORTED = ()
+    
+    @classmethod
+    def from_dict(cls, voice_hash, data):
+        """Perfil no formato JSON antigo (ou registro já pronto)"""
+        if isinstance(data, cls):
+            return data
+        return cls(voice_hash, *(data.get(column) for column in cls.COLUMNS[1:]))
+    
+    def to_row(self):
+        return tuple(getattr(self, column) for column in self.COLUMNS)
+    
+    def to_dict(self):
+        """Formato JSON original (ISO-8601), gerado só na exportação"""
+        data = {}
+        for column in self.EXPORTED:
+            value = getattr(self, column)
+            data[column] = to_iso(value) if column in self.TIMESTAMPS else value
+        return data
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.voice_hash!r})"
+
+class VoiceProfile(ProfileRecord):
+    """Perfil de voz (uma entrada por locutor)"""
+    
+    COLUMNS = ('voice_hash', 'first_detected', 'last_detected', 'detection_count', 'embedding')
+    TIMESTAMPS = ('first_detected', 'last_detected')
+    EXPORTED = ('first_detected', 'detection_count', 'last_detected')
+    __slots__ = COLUMNS
+    
+    def __init__(self, voice_hash, first_detected=None, last_detected=None, detection_count=0, embedding=None):
+        self.voice_hash = sys.intern(voice_hash)
+        self.first_detected = to_epoch(first_detected)
+        self.last_detected = to_epoch(last_detected)
+        self.detection_count = detection_count or 0
+        self.embedding = embedding
+
+class UserProfile(ProfileRecord):
+    """Usuário registrado, ligado a um perfil de voz"""
+    
+    COLUMNS = ('voice_hash', 'id', 'name', 'registered_at', 'interaction_count')
+    TIMESTAMPS = ('registered_at',)
+    EXPORTED = ('id', 'name', 'voice_hash', 'registered_at', 'interaction_count')
+    __slots__ = COLUMNS
+    
+    def __init__(self, voice_hash, id=None, name=None, registered_at=None, interaction_count=0):
+        self.voice_hash = sys.intern(voice_hash)
+        self.id = sys.intern(id) if id else id
+        self.name = name
+        self.registered_at = to_epoch(registered_at)
+        self.interaction_count = interaction_count or 0
+
+class ProfileTable:
+    """Visão tipo dicionário de uma tabela de perfis; nada fica carregado em memória
+    
+    Cada acesso é uma consulta pela chave primária (voice_hash).
+    """
+    
+    def __init__(self, store, table, record_class, order_by):
+        self.store = store
+        self.table = table
+        self.record_class = record_class
+        self.columns = record_class.COLUMNS
+        self.order_by = order_by
+        self.select = f"SELECT {', '.join(self.columns)} FROM {table}"
+    
+    def row_to_profile(self, row):
+        return self.record_class(*row)
+    
+    def get(self, voice_hash, default=None):
+        with self.store.lock:
+            row = self.store.db.execute(
+                f"{self.select} WHERE voice_hash = ?", (voice_hash,)
+            ).fetchone()
+        return self.row_to_profile(row) if row else default
+    
+    def __getitem__(self, voice_hash):
+        profile = self.get(voice_hash)
+        if profile is None:
+            raise KeyError(voice_hash)
+        return profile
+    
+    def __contains__(self, voice_hash):
+        with self.store.lock:
+            return self.store.db.execute(
+                f"SELECT 1 FROM {self.table} WHERE voice_hash = ?", (voice_hash,)
+            ).fetchone() is not None
+    
+    def __len__(self):
+        with self.store.lock:
+            return self.store.db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+    
+    def __setitem__(self, voice_hash, profile):
+        self.upsert_many([(voice_hash, profile)])
+    
+    def __delitem__(self, voice_hash):
+        with self.store.lock, self.store.db:
+            self.store.db.execute(f"DELETE FROM {self.table} WHERE voice_hash = ?", (voice_hash,))
+    
+    def upsert_many(self, items):
+        """Grava vários perfis (registros ou dicts no formato antigo) numa única transação"""
+        placeholders = ', '.join('?' * len(self.columns))
+        rows = [self.record_class.from_dict(voice_hash, profile).to_row() for voice_hash, profile in items]
+        with self.store.lock, self.store.db:
+            self.store.db.executemany(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(self.columns)}) VALUES ({placeholders})",
+                rows
+            )
+    
+    def page(self, offset=0, limit=50):
+        """Uma página de (voice_hash, perfil), mais recentes primeiro"""
+        with self.store.lock:
+            rows = self.store.db.execute(
+                f"{self.select} ORDER BY {self.order_by} DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+        return [(row[0], self.row_to_profile(row)) for row in rows]
+    
+    def items(self, batch=500):
+        """Itera em lotes pela chave, sem segurar o lock entre lotes"""
+        last = ''
+        while True:
+            with self.store.lock:
+                rows = self.store.db.execute(
+                    f"{self.select} WHERE voice_hash > ? ORDER BY voice_hash LIMIT ?", (last, batch)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row[0], self.row_to_profile(row)
+            last = rows[-1][0]
+    
+    def keys(self):
+        return (voice_hash for voice_hash, _ in self.items())
+    
+    def __iter__(self):
+        return self.keys()
+
+class ProfileStore:
+    """Perfis de voz e de usuário em SQLite, indexados por voice_hash"""
+    
+    def __init__(self, path='database.db'):
+        self.path = path
+        self.lock = threading.Lock()
+        
+        # Conexão compartilhada entre UI e threads de voz (protegida pelo lock)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA cache_size=-2048")  # Cache limitado a ~2 MB
+        
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS voice_profiles ("
+                "voice_hash TEXT PRIMARY KEY, first_detected INTEGER, "
+                "last_detected INTEGER, detection_count INTEGER NOT NULL DEFAULT 0, embedding BLOB)"
+            )
+            # Bancos anteriores aos embeddings de voz
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(voice_profiles)")]
+            if 'embedding' not in columns:
+                self.db.execute("ALTER TABLE voice_profiles ADD COLUMN embedding BLOB")
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS voice_last_detected ON voice_profiles (last_detected)"
+            )
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS user_profiles ("
+                "voice_hash TEXT PRIMARY KEY, id TEXT, name TEXT, "
+                "registered_at INTEGER, interaction_count INTEGER NOT NULL DEFAULT 0)"
+            )
+            self.db.execute(
+                "CREATE INDEX IF NOT EXISTS user_registered_at ON user_profiles (registered_at)"
+            )
+        
+            self.convert_iso_timestamps()
+        
+        self.voice_profiles = ProfileTable(self, 'voice_profiles', VoiceProfile, 'last_detected')
+        self.user_profiles = ProfileTable(self, 'user_profiles', UserProfile, 'registered_at')
+    
+    def convert_iso_timestamps(self):
+        """Bancos anteriores guardavam ISO-8601: converter uma vez para epoch"""
+        for table, columns in (('voice_profiles', VoiceProfile.TIMESTAMPS), ('user_profiles', UserProfile.TIMESTAMPS)):
+            for column in columns:
+                rows = self.db.execute(
+                    f"SELECT voice_hash, {column} FROM {table} WHERE {column} GLOB '*-*'"
+                ).fetchall()
+                self.db.executemany(
+                    f"UPDATE {table} SET {column} = ? WHERE voice_hash = ?",
+                    [(to_epoch(value), voice_hash) for voice_hash, value in rows]
+                )
+    
+    def record_detection(self, voice_hash, timestamp):
+        """Conta uma detecção da voz (cria o perfil na primeira vez)"""
+        with self.lock, self.db:
+            self.db.execute(
+                "INSERT INTO voice_profiles (voice_hash, first_detected, last_detected, detection_count) "
+                "VALUES (?, ?, ?, 1) "
+                "ON CONFLICT(voice_hash) DO UPDATE SET "
+                "detection_count = detection_count + 1, last_detected = excluded.last_detected",
+                (voice_hash, timestamp, timestamp)
+            )
+    
+    def set_embedding(self, voice_hash, embedding):
+        """Grava o embedding (bytes float32) de um perfil de voz"""
+        with self.lock, self.db:
+            self.db.execute(
+                "UPDATE voice_profiles SET embedding = ? WHERE voice_hash = ?", (embedding, voice_hash)
+            )
+    
+    def embeddings(self):
+        """Todos os (voice_hash, embedding) existentes, numa única consulta"""
+        with self.lock:
+            return self.db.execute(
+                "SELECT voice_hash, embedding FROM voice_profiles WHERE embedding IS NOT NULL"
+            ).fetchall()
+    
+    def close(self):
+        with self.lock:
+            self.db.close()
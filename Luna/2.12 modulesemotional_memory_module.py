@@ -0,0 +1,151 @@
+import time
+import threading
+import numpy as np
+
+EMOTIONS = ['happy', 'sad', 'love', 'angry', 'excited', 'neutral']
+
+# Nome → (duração total em segundos, quantidade de baldes)
+WINDOWS = {
+    'hour': (3600, 60),
+    'day': (86400, 24),
+    'month': (30 * 86400, 30)
+}
+
+class RollingWindow:
+    """Janela deslizante em baldes circulares com totais mantidos incrementalmente"""
+    
+    def __init__(self, span, buckets, emotions=len(EMOTIONS)):
+        self.width = span / buckets
+        self.counts = np.zeros((buckets, emotions))
+        self.love = np.zeros(buckets)
+        self.total_counts = np.zeros(emotions)
+        self.total_love = 0.0
+        self.current = None  # Número absoluto do balde mais novo
+    
+    def advance(self, now):
+        """Expira baldes antigos; custo limitado ao número de baldes"""
+        bucket = int(now // self.width)
+        if self.current is None:
+            self.current = bucket
+            return
+        if bucket <= self.current:
+            return
+        
+        size = len(self.love)
+        for absolute in range(max(self.current + 1, bucket - size + 1), bucket + 1):
+            slot = absolute % size
+            self.total_counts -= self.counts[slot]
+            self.total_love -= self.love[slot]
+            self.counts[slot] = 0
+            self.love[slot] = 0
+        self.current = bucket
+    
+    def record(self, emotion_index, love_delta, now):
+        self.advance(now)
+        slot = self.current % len(self.love)
+        if emotion_index is not None:
+            self.counts[slot, emotion_index] += 1
+            self.total_counts[emotion_index] += 1
+        self.love[slot] += love_delta
+        self.total_love += love_delta
+    
+    def to_dict(self):
+        return {
+            'current': self.current,
+            'counts': self.counts.tolist(),
+            'love': self.love.tolist()
+        }
+    
+    def load(self, data):
+        """Restaura estado salvo (ignorado se o formato da janela mudou)"""
+        counts = np.array(data.get('counts', []), dtype=float)
+        love = np.array(data.get('love', []), dtype=float)
+        if counts.shape != self.counts.shape or love.shape != self.love.shape:
+            return
+        self.counts = counts
+        self.love = love
+        self.total_counts = counts.sum(axis=0)
+        self.total_love = float(love.sum())
+        self.current = data.get('current')
+
+class EmotionalMemory:
+    """Contagens de emoções e variação do amor na última hora, dia e mês
+    
+    Cada interação custa O(1); consultas leem só os totais das janelas.
+    Eventos têm número de sequência para a reaplicação do diário ser idempotente.
+    """
+    
+    def __init__(self):
+        self.windows = {name: RollingWindow(span, buckets) for name, (span, buckets) in WINDOWS.items()}
+        self.index = {emotion: i for i, emotion in enumerate(EMOTIONS)}
+        self.seq = 0
+        self.lock = threading.Lock()
+    
+    def record(self, emotion, love_delta=0.0, now=None, on_event=None):
+        """Registra interação; devolve o evento para o diário
+        
+        on_event(evento) roda ainda sob o lock, para o diário receber os
+        eventos na mesma ordem das sequências.
+        """
+        now = now or time.time()
+        emotion_index = self.index.get(emotion)
+        with self.lock:
+            self.seq += 1
+            for window in self.windows.values():
+                window.record(emotion_index, love_delta, now)
+            event = {'seq': self.seq, 'ts': now, 'emotion': emotion, 'love': love_delta}
+            if on_event is not None:
+                on_event(event)
+            return event
+    
+    def replay(self, event):
+        """Reaplica evento do diário (ignora os já contidos no snapshot)"""
+        with self.lock:
+            if event['seq'] <= self.seq:
+                return
+            self.seq = event['seq']
+            emotion_index = self.index.get(event['emotion'])
+            for window in self.windows.values():
+                window.record(emotion_index, event['love'], event['ts'])
+    
+    def counts(self, window='day', now=None):
+        """Contagem por emoção na janela"""
+        with self.lock:
+            rolling = self.windows[window]
+            rolling.advance(now or time.time())
+            return {emotion: int(rolling.total_counts[i]) for emotion, i in self.index.items()}
+    
+    def dominant_emotion(self, window='hour', now=None):
+        """Emoção mais frequente na janela ('neutral' sem interações)"""
+        with self.lock:
+            rolling = self.windows[window]
+            rolling.advance(now or time.time())
+            if rolling.total_counts.sum() <= 0:
+                return 'neutral'
+            return EMOTIONS[int(np.argmax(rolling.total_counts))]
+    
+    def love_trend(self, window='day', now=None):
+        """Soma das variações do amor na janela"""
+        with self.lock:
+            rolling = self.windows[window]
+            rolling.advance(now or time.time())
+            return round(rolling.total_love, 2)
+    
+    def to_dict(self):
+        with self.lock:
+            return {
+                'seq': self.seq,
+                'windows': {name: window.to_dict() for name, window in self.windows.items()}
+            }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Snapshot + eventos do diário ainda não incorporados"""
+        memory = cls()
+        memory.seq = data.get('seq', 0)
+        for name, window in data.get('windows', {}).items():
+            if name in memory.windows:
+                memory.windows[name].load(window)
+        for event in data.get('events', []):
+            memory.replay(event)
+        return memory
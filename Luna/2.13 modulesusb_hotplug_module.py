@@ -0,0 +1,210 @@
+import os
+import time
+import errno
+import select
+import socket
+import ctypes
+import threading
+import ctypes.util
+from datetime import datetime
+
+NETLINK_KOBJECT_UEVENT = 15
+
+# Máscaras do inotify (linux/inotify.h)
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+def read_attribute(path, name):
+    try:
+        with open(os.path.join(path, name), 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+def read_usb_devices(sysfs_root='/sys'):
+    """Dispositivos USB em <sysfs_root>/bus/usb/devices (interfaces "1-1:1.0" ficam de fora)"""
+    devices = {}
+    directory = os.path.join(sysfs_root, 'bus', 'usb', 'devices')
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return devices
+    
+    for name in names:
+        if ':' in name:
+            continue
+        path = os.path.join(directory, name)
+        vendor = read_attribute(path, 'idVendor')
+        product_id = read_attribute(path, 'idProduct')
+        if not vendor and not product_id:
+            continue  # Entrada ainda incompleta ou não é dispositivo
+        
+        description = ' '.join(filter(None, [read_attribute(path, 'manufacturer'), read_attribute(path, 'product')]))
+        devices[name] = {
+            'id': name,
+            'description': description or f"USB {vendor}:{product_id}",
+            'vendor_id': vendor,
+            'product_id': product_id,
+            'serial': read_attribute(path, 'serial'),
+            'connected': True,
+            'first_seen': datetime.now().isoformat()
+        }
+    return devices
+
+class UsbHotplugMonitor:
+    """Detecção de USB por eventos do kernel, sem polling
+    
+    No sysfs real escuta os uevents via netlink; numa árvore sysfs falsa
+    (testes) usa inotify no diretório de dispositivos. Em ambos os casos a
+    thread fica bloqueada em select() até chegar um evento, e só então relê
+    a lista de dispositivos e compara com a anterior.
+    """
+    
+    def __init__(self, on_change, sysfs_root='/sys'):
+        self.on_change = on_change  # on_change(event_type, device)
+        self.sysfs_root = sysfs_root
+        self.devices_dir = os.path.join(sysfs_root, 'bus', 'usb', 'devices')
+        self.devices = {}
+        self.source = None
+        self.kind = None
+        # Pipe para acordar o select(); só existe enquanto run() está ativo
+        self.wake_read = self.wake_write = None
+        self.wake_lock = threading.Lock()
+        self.stopping = False
+        
+        # Estatísticas
+        self.events = 0
+        self.rescans = 0
+        self.last_latency_ms = None
+    
+    @staticmethod
+    def available(sysfs_root='/sys'):
+        return os.path.isdir(os.path.join(sysfs_root, 'bus', 'usb', 'devices'))
+    
+    def open_netlink(self):
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, 1))  # Grupo 1: uevents do kernel
+        sock.setblocking(False)
+        return sock
+    
+    def open_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        if libc.inotify_add_watch(fd, self.devices_dir.encode(), mask) < 0:
+            os.close(fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch falhou")
+        return fd
+    
+    def open_source(self):
+        """Netlink para o sysfs real; inotify para árvores alternativas"""
+        if os.path.realpath(self.sysfs_root) == '/sys':
+            try:
+                self.source = self.open_netlink()
+                self.kind = 'netlink'
+                return
+            except OSError:
+                pass  # Sem permissão/suporte: tentar inotify
+        self.source = self.open_inotify()
+        self.kind = 'inotify'
+    
+    def fileno(self):
+        return self.source.fileno() if self.kind == 'netlink' else self.source
+    
+    def drain(self):
+        """Consome os eventos pendentes; True se algum diz respeito a USB"""
+        relevant = False
+        while True:
+            try:
+                if self.kind == 'netlink':
+                    data = self.source.recv(65536)
+                else:
+                    data = os.read(self.source, 65536)
+            except BlockingIOError:
+                return relevant
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    return relevant
+                if e.errno == errno.ENOBUFS:
+                    return True  # Eventos perdidos: reler tudo
+                raise
+            if not data:
+                return relevant
+            
+            self.events += 1
+            if self.kind == 'inotify' or b'SUBSYSTEM=usb\0' in data:
+                relevant = True
+    
+    def rescan(self, started=None):
+        """Relê os dispositivos e emite as diferenças"""
+        current = read_usb_devices(self.sysfs_root)
+        self.rescans += 1
+        
+        for device_id, device in current.items():
+            if device_id not in self.devices:
+                self.on_change('usb_connected', device)
+        for device_id, device in self.devices.items():
+            if device_id not in current:
+                self.on_change('usb_disconnected', device)
+        
+        self.devices = current
+        if started is not None:
+            self.last_latency_ms = round((time.perf_counter() - started) * 1000, 3)
+    
+    def run(self, initial=None):
+        """Bloqueia até stop(); `initial` evita anunciar o que já estava conectado"""
+        with self.wake_lock:
+            if self.stopping:
+                return
+            self.wake_read, self.wake_write = os.pipe()
+        try:
+            self.open_source()
+            self.devices = initial if initial is not None else read_usb_devices(self.sysfs_root)
+            while True:
+                ready, _, _ = select.select([self.fileno(), self.wake_read], [], [])
+                if self.wake_read in ready:
+                    break
+                started = time.perf_counter()
+                if self.drain():
+                    self.rescan(started)
+        finally:
+            self.close_source()
+            with self.wake_lock:
+                os.close(self.wake_read)
+                os.close(self.wake_write)
+                self.wake_read = self.wake_write = None
+    
+    def stop(self):
+        """Acorda a thread bloqueada em select() (ou impede run() de começar)"""
+        with self.wake_lock:
+            self.stopping = True
+            if self.wake_write is None:
+                return
+            try:
+                os.write(self.wake_write, b'x')
+            except OSError:
+                pass
+    
+    def close_source(self):
+        if self.source is None:
+            return
+        if self.kind == 'netlink':
+            self.source.close()
+        else:
+            os.close(self.source)
+        self.source = None
+    
+    def get_stats(self):
+        return {
+            'backend': self.kind,
+            'devices': len(self.devices),
+            'events': self.events,
+            'rescans': self.rescans,
+            'last_latency_ms': self.last_latency_ms
+        }
@@ -0,0 +1,151 @@
+import os
+import sys
+import hashlib
+import subprocess
+
+MISSING = 'Não carregado'  # Status de driver novo (antes) ou removido (depois)
+
+class LinuxModuleSource:
+    """Módulos do kernel lidos de /proc/modules e /sys/module, sem subprocesso"""
+    
+    name = 'linux'
+    
+    def __init__(self, proc_root='/proc', sysfs_root='/sys'):
+        self.proc_modules = os.path.join(proc_root, 'modules')
+        self.sys_module = os.path.join(sysfs_root, 'module')
+    
+    def available(self):
+        return os.path.exists(self.proc_modules) or os.path.isdir(self.sys_module)
+    
+    def read(self):
+        """Conteúdo bruto para o hash: /proc/modules + nomes em /sys/module"""
+        try:
+            with open(self.proc_modules, 'rb') as f:
+                modules = f.read()
+        except OSError:
+            modules = b''
+        try:
+            names = '\n'.join(sorted(os.listdir(self.sys_module))).encode()
+        except OSError:
+            names = b''
+        return modules + b'\0' + names
+    
+    def parse(self, raw):
+        """{nome: status}; carregáveis pelo estado, embutidos como 'Builtin'"""
+        modules, _, names = raw.partition(b'\0')
+        entries = {}
+        for line in modules.decode('utf-8', 'ignore').splitlines():
+            fields = line.split()
+            if len(fields) >= 5:
+                # nome tamanho refcount dependências estado endereço
+                entries[fields[0]] = 'OK' if fields[4] == 'Live' else fields[4]
+        
+        for name in names.decode('utf-8', 'ignore').splitlines():
+            if not name or name in entries:
+                continue
+            try:
+                with open(os.path.join(self.sys_module, name, 'initstate'), 'r') as f:
+                    state = f.read().strip()
+                entries[name] = 'OK' if state == 'live' else state.title()
+            except OSError:
+                entries[name] = 'Builtin'  # Sem initstate: compilado no kernel
+        return entries
+
+class WmicSource:
+    """Drivers PnP do Windows via WMIC"""
+    
+    name = 'wmic'
+    
+    def available(self):
+        return sys.platform == 'win32'
+    
+    def read(self):
+        result = subprocess.run(
+            ['wmic', 'path', 'win32_pnpentity', 'get', 'name,status'],
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='ignore'
+        )
+        return result.stdout.encode('utf-8')
+    
+    def parse(self, raw):
+        entries = {}
+        lines = raw.decode('utf-8').strip().split('\n')
+        for line in lines[1:]:  # Skip header
+            if line.strip():
+                parts = line.strip().rsplit('  ', 1)
+                if len(parts) == 2:
+                    name, status = parts
+                    entries[name.strip()] = status.strip()
+        return entries
+
+class DriverInventory:
+    """Inventário de drivers com diff por snapshot
+    
+    Cada verificação lê o conteúdo bruto e compara só o hash: inventário
+    igual custa uma comparação. O parse e o diff por entrada só acontecem
+    quando o hash muda (e eventos só se o status de algum driver mudou).
+    """
+    
+    def __init__(self, source=None):
+        self.source = source or self.default_source()
+        self.raw_digest = None
+        self.entries = {}
+        
+        # Estatísticas
+        self.checks = 0
+        self.parses = 0
+    
+    @staticmethod
+    def default_source():
+        for source in (WmicSource(), LinuxModuleSource()):
+            if source.available():
+                return source
+        return None
+    
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=16).digest()
+    
+    def read(self):
+        """Inventário atual {nome: status}, sem mexer na base usada por check()"""
+        return self.source.parse(self.source.read())
+    
+    def check(self):
+        """Lista de mudanças [(nome, status_antigo, status_novo)] desde a última verificação
+        
+        Driver novo tem status antigo MISSING; driver removido, status novo MISSING.
+        A primeira chamada só monta a base e devolve [].
+        """
+        raw = self.source.read()
+        self.checks += 1
+        raw_digest = self.digest(raw)
+        if raw_digest == self.raw_digest:
+            return []
+        
+        first = self.raw_digest is None
+        self.raw_digest = raw_digest
+        entries = self.source.parse(raw)
+        self.parses += 1
+        previous, self.entries = self.entries, entries
+        if first:
+            return []
+        
+        changes = []
+        for name, status in entries.items():
+            old_status = previous.get(name, MISSING)
+            if old_status != status:
+                changes.append((name, old_status, status))
+        for name, old_status in previous.items():
+            if name not in entries:
+                changes.append((name, old_status, MISSING))
+        return changes
+    
+    def get_stats(self):
+        return {
+            'backend': self.source.name if self.source else None,
+            'drivers': len(self.entries),
+            'checks': self.checks,
+            'parses': self.parses
+        }
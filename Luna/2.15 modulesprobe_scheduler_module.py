@@ -0,0 +1,169 @@
+import time
+import heapq
+import random
+import threading
+
+class Probe:
+    """Verificação periódica registrada no agendador"""
+    
+    __slots__ = ('name', 'func', 'interval', 'jitter', 'max_backoff', 'failures',
+                 'due', 'active', 'runs', 'errors', 'missed', 'total_time',
+                 'last_time', 'max_time', 'last_error')
+    
+    def __init__(self, name, func, interval, jitter, max_backoff):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.failures = 0  # Falhas consecutivas
+        self.due = 0.0
+        self.active = True
+        
+        # Estatísticas
+        self.runs = 0
+        self.errors = 0
+        self.missed = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+        self.last_error = None
+    
+    def next_delay(self):
+        """Intervalo com jitter; dobra a cada falha consecutiva até max_backoff"""
+        delay = self.interval
+        if self.failures:
+            delay = min(self.interval * 2 ** self.failures, self.max_backoff)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return delay
+    
+    def get_stats(self):
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'errors': self.errors,
+            'failures': self.failures,
+            'missed_deadlines': self.missed,
+            'avg_ms': round(self.total_time / self.runs * 1000, 3) if self.runs else 0.0,
+            'last_ms': round(self.last_time * 1000, 3),
+            'max_ms': round(self.max_time * 1000, 3),
+            'last_error': self.last_error
+        }
+
+class ProbeScheduler:
+    """Uma thread para todas as verificações periódicas
+    
+    As próximas execuções ficam num heap ordenado pelo horário; a thread
+    dorme numa Condition até o primeiro vencimento, então registrar ou parar
+    acorda na hora. Execução que começa depois de `tolerance` segundos do
+    horário previsto conta como prazo perdido.
+    """
+    
+    def __init__(self, tolerance=0.1):
+        self.tolerance = tolerance
+        self.probes = {}
+        self.heap = []  # (vencimento, sequência, probe)
+        self.seq = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+    
+    def register(self, name, func, interval, jitter=0.1, max_backoff=None, delay=0.0):
+        """Agenda func() a cada `interval` segundos; substitui probe de mesmo nome"""
+        probe = Probe(name, func, interval, jitter, max_backoff or interval * 16)
+        with self.condition:
+            previous = self.probes.get(name)
+            if previous:
+                previous.active = False  # Entrada antiga no heap é descartada
+            self.probes[name] = probe
+            self.push(probe, time.monotonic() + delay)
+            self.condition.notify()
+        return probe
+    
+    def unregister(self, name):
+        with self.condition:
+            probe = self.probes.pop(name, None)
+            if probe:
+                probe.active = False
+                self.condition.notify()
+    
+    def push(self, probe, due):
+        probe.due = due
+        self.seq += 1
+        heapq.heappush(self.heap, (due, self.seq, probe))
+    
+    def start(self):
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self.run, name='probe-scheduler')
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self, timeout=5.0):
+        """Acorda a thread na hora e espera a probe em execução terminar"""
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+        self.thread = None
+    
+    def next_probe(self):
+        """Bloqueia até a próxima probe vencer; None ao parar"""
+        with self.condition:
+            while self.running:
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                due, _, probe = self.heap[0]
+                if not probe.active:
+                    heapq.heappop(self.heap)
+                    continue
+                wait = due - time.monotonic()
+                if wait > 0:
+                    self.condition.wait(wait)
+                    continue
+                heapq.heappop(self.heap)
+                return probe
+            return None
+    
+    def run(self):
+        while True:
+            probe = self.next_probe()
+            if probe is None:
+                return
+            
+            started = time.monotonic()
+            if started - probe.due > self.tolerance:
+                probe.missed += 1
+            try:
+                probe.func()
+                probe.failures = 0
+            except Exception as e:
+                probe.errors += 1
+                probe.failures += 1
+                probe.last_error = str(e)
+                print(f"⚠️ Erro na verificação '{probe.name}': {e}")
+            finished = time.monotonic()
+            
+            elapsed = finished - started
+            probe.runs += 1
+            probe.total_time += elapsed
+            probe.last_time = elapsed
+            probe.max_time = max(probe.max_time, elapsed)
+            
+            with self.condition:
+                if probe.active:
+                    if probe.failures:
+                        due = finished + probe.next_delay()
+                    else:
+                        # A partir do horário previsto, sem acumular atraso
+                        due = max(probe.due + probe.next_delay(), finished)
+                    self.push(probe, due)
+    
+    def get_stats(self):
+        with self.condition:
+            return {name: probe.get_stats() for name, probe in self.probes.items()}
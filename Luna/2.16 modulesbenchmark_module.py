@@ -0,0 +1,33 @@
+import json
+
+def percentile(values, p):
+    """Percentil com interpolação linear"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+def summarize(samples, digits=4):
+    """Resumo em milissegundos"""
+    return {
+        'p50': round(percentile(samples, 50) * 1000, digits),
+        'p95': round(percentile(samples, 95) * 1000, digits),
+        'p99': round(percentile(samples, 99) * 1000, digits),
+        'mean': round(sum(samples) / len(samples) * 1000, digits) if samples else 0.0
+    }
+
+def add_output_argument(parser):
+    """Opção --output comum a todos os benchmarks"""
+    parser.add_argument('--output', default=None, help="Arquivo JSON (padrão: stdout)")
+
+def write_report(report, output=None):
+    """Relatório em JSON no arquivo `output` ou no stdout"""
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
@@ -4,10 +4,595 @@ import threading
 import queue
 import time
 import json
-import os
-from datetime import datetime
 import wave
 import pyaudio
+import itertools
+import numpy as np
+from collections import deque
+from audio_module import WakeWordDetector, AudioPreprocessor
+from tts_cache_module import SpeechCache
+from voice_archive_module import VoiceArchive
+from recognizer_module import create_backend
+
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+# Velocidade da fala por emoção
+SPEECH_RATES = {
+    "excited": 220,
+    "happy": 200,
+    "neutral": 180,
+    "sad": 150,
+    "love": 170
+}
+
+# Prioridades de fala (menor = mais urgente)
+PRIORITY_USER = 0
+PRIORITY_SYSTEM = 1
+PRIORITY_WARM = 2  # Pré-renderização do cache, só quando não há mais nada
+
+# Ruído de fundo: janela dividida em blocos para o mínimo deslizante; suavização em segundos
+NOISE_BLOCKS = 8
+NOISE_SMOOTHING = 0.1
+
+def chunk_energy(buffer, sample_width):
+    """Energia RMS de um bloco de áudio PCM"""
+    samples = np.frombuffer(buffer, dtype=SAMPLE_DTYPES[sample_width])
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2)))
+
+class ContinuousListener:
+    """Mantém o microfone aberto e entrega frases completas com limiar adaptativo"""
+    
+    def __init__(self, microphone, recognizer=None, noise_window=3.0, threshold_ratio=2.5,
+                 min_threshold=150, pause_threshold=0.8, phrase_time_limit=10,
+                 min_phrase=0.25, pre_roll=0.3):
+        self.microphone = microphone
+        self.recognizer = recognizer
+        self.noise_window = noise_window  # Segundos de memória do ruído de fundo
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+        self.pause_threshold = pause_threshold
+        self.phrase_time_limit = phrase_time_limit
+        self.min_phrase = min_phrase
+        self.pre_roll = pre_roll
+        
+        self.source = None
+        self.noise_floor = None
+        self.energy_threshold = min_threshold
+        
+        # Estatística de mínimos: menor energia (suavizada) em blocos da janela de ruído
+        self.noise_blocks = deque(maxlen=NOISE_BLOCKS - 1)
+        self.block_minimum = None
+        self.block_elapsed = 0.0
+        self.smoothed_energy = None
+    
+    def __enter__(self):
+        self.open()
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def open(self):
+        """Abre o dispositivo uma única vez para toda a sessão"""
+        if self.source is None:
+            self.source = self.microphone.__enter__()
+    
+    def close(self):
+        """Fecha o dispositivo"""
+        if self.source is not None:
+            self.microphone.__exit__(None, None, None)
+            self.source = None
+    
+    def update_noise_floor(self, energy, chunk_seconds):
+        """Ruído de fundo = menor energia suavizada nos últimos `noise_window` segundos
+        
+        Alimentada com todos os blocos, com ou sem fala: pausas entre palavras
+        mantêm o mínimo no nível do ruído, e um ambiente que ficou mais
+        barulhento é aprendido em no máximo uma janela.
+        """
+        if self.smoothed_energy is None:
+            self.smoothed_energy = energy
+        else:
+            alpha = min(1.0, chunk_seconds / NOISE_SMOOTHING)
+            self.smoothed_energy += (energy - self.smoothed_energy) * alpha
+        
+        if self.block_minimum is None or self.smoothed_energy < self.block_minimum:
+            self.block_minimum = self.smoothed_energy
+        self.block_elapsed += chunk_seconds
+        if self.block_elapsed >= self.noise_window / NOISE_BLOCKS:
+            self.noise_blocks.append(self.block_minimum)
+            self.block_minimum = None
+            self.block_elapsed = 0.0
+        
+        candidates = list(self.noise_blocks)
+        if self.block_minimum is not None:
+            candidates.append(self.block_minimum)
+        self.noise_floor = min(candidates)
+        
+        self.energy_threshold = max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+        if self.recognizer is not None:
+            self.recognizer.energy_threshold = self.energy_threshold
+    
+    def phrases(self, keep_running=lambda: True, timeout=None):
+        """Gera sr.AudioData para cada frase detectada, sem fechar o dispositivo
+        
+        Com `timeout`, encerra se nenhuma fala começar dentro do prazo.
+        """
+        source = self.source
+        if source is None or source.stream is None:
+            return
+        
+        chunk_size = source.CHUNK
+        sample_rate = source.SAMPLE_RATE
+        sample_width = source.SAMPLE_WIDTH
+        chunk_seconds = chunk_size / sample_rate
+        
+        pre_roll = deque(maxlen=max(1, int(self.pre_roll / chunk_seconds)))
+        frames = []
+        energies = []
+        silence = 0.0
+        waited = 0.0
+        
+        while keep_running():
+            buffer = source.stream.read(chunk_size)
+            if not buffer:
+                break
+            energy = chunk_energy(buffer, sample_width)
+            self.update_noise_floor(energy, chunk_seconds)
+            
+            if not frames:
+                if energy <= self.energy_threshold:
+                    pre_roll.append(buffer)
+                    waited += chunk_seconds
+                    if timeout is not None and waited >= timeout:
+                        return
+                    continue
+                
+                frames = list(pre_roll)
+                pre_roll.clear()
+                energies = []
+                silence = 0.0
+            
+            frames.append(buffer)
+            if energy <= self.energy_threshold:
+                silence += chunk_seconds
+            else:
+                silence = 0.0
+                energies.append(energy)
+            duration = len(frames) * chunk_seconds
+            
+            if silence >= self.pause_threshold or duration >= self.phrase_time_limit:
+                # Ruído que subiu de nível: a "frase" não passa do limiar já reajustado
+                speech = energies and float(np.median(energies)) > self.energy_threshold
+                if speech and duration - silence >= self.min_phrase:
+                    yield sr.AudioData(b''.join(frames), sample_rate, sample_width)
+                    waited = 0.0
+                frames = []
+
+class StageMetrics:
+    """Contadores de um estágio do pipeline de voz"""
+    
+    def __init__(self, name, output_queue=None):
+        self.name = name
+        self.output_queue = output_queue
+        self.lock = threading.Lock()
+        self.processed = 0
+        self.dropped = 0
+        self.busy_time = 0.0
+        self.blocked_time = 0.0  # Tempo esperando fila cheia adiante (backpressure)
+        self.max_depth = 0
+    
+    def record(self, busy=0.0, blocked=0.0):
+        with self.lock:
+            self.processed += 1
+            self.busy_time += busy
+            self.blocked_time += blocked
+            if self.output_queue is not None:
+                self.max_depth = max(self.max_depth, self.output_queue.qsize())
+    
+    def record_drop(self):
+        with self.lock:
+            self.dropped += 1
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'avg_ms': round(self.busy_time / self.processed * 1000, 2) if self.processed else 0.0,
+                'blocked_ms': round(self.blocked_time * 1000, 2),
+                'queue_depth': self.output_queue.qsize() if self.output_queue is not None else 0,
+                'max_queue_depth': self.max_depth
+            }
+
+class VoicePipeline:
+    """Captura → reconhecimento → despacho em threads separadas com filas limitadas"""
+    
+    def __init__(self, capture, recognize, dispatch, workers=2, audio_queue=None, max_pending=8):
+        self.capture = capture  # capture(keep_running) -> gerador de AudioData
+        self.recognize = recognize
+        self.dispatch = dispatch
+        self.workers = workers
+        self.audio_queue = audio_queue if audio_queue is not None else queue.Queue(maxsize=max_pending)
+        self.text_queue = queue.Queue(maxsize=max_pending)
+        self.running = False
+        self.threads = []
+        self.stop_event = None  # Um por sessão: threads antigas não voltam a consumir
+        
+        # Sequências descartadas por estouro (o despachante pula essas)
+        self.skipped = set()
+        self.skipped_lock = threading.Lock()
+        
+        self.metrics = {
+            'capture': StageMetrics('capture', self.audio_queue),
+            'recognition': StageMetrics('recognition', self.text_queue),
+            'dispatch': StageMetrics('dispatch')
+        }
+    
+    def start(self):
+        """Inicia as threads de cada estágio"""
+        if self.running:
+            return
+        
+        # Descartar sobras (inclusive sentinelas) de uma sessão anterior
+        while not self.audio_queue.empty():
+            try:
+                self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+        
+        self.running = True
+        self.stop_event = threading.Event()
+        targets = [self.capture_loop, self.dispatch_loop]
+        targets += [self.recognition_loop] * self.workers
+        
+        for target in targets:
+            thread = threading.Thread(target=target, args=(self.stop_event,))
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+    
+    def stop(self, timeout=2.0):
+        """Encerra os estágios e espera todas as threads da sessão"""
+        if not self.running:
+            return
+        
+        self.running = False
+        self.stop_event.set()
+        for _ in range(self.workers):
+            try:
+                self.audio_queue.put(None, timeout=0.5)
+            except queue.Full:
+                break  # Workers também saem pelo evento da sessão
+        
+        # Captura solta o microfone; workers terminam o reconhecimento em curso
+        deadline = time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self.threads = []
+    
+    def offer(self, item):
+        """Enfileira áudio sem travar a captura; se cheio, descarta o mais antigo"""
+        while True:
+            try:
+                self.audio_queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    oldest = self.audio_queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if oldest is not None:
+                    with self.skipped_lock:
+                        self.skipped.add(oldest[0])
+                    self.metrics['capture'].record_drop()
+    
+    def capture_loop(self, stop_event):
+        sequence = 0
+        start = time.perf_counter()
+        for audio in self.capture(lambda: not stop_event.is_set()):
+            if stop_event.is_set():
+                break
+            self.offer((sequence, audio))
+            self.metrics['capture'].record(busy=time.perf_counter() - start)
+            sequence += 1
+            start = time.perf_counter()
+    
+    def recognition_loop(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                item = self.audio_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            if stop_event.is_set():
+                # Sessão encerrada: o áudio pertence à próxima
+                try:
+                    self.audio_queue.put_nowait(item)
+                except queue.Full:
+                    with self.skipped_lock:
+                        self.skipped.add(item[0])
+                break
+            
+            sequence, audio = item
+            text = None
+            start = time.perf_counter()
+            try:
+                text = self.recognize(audio)
+            except Exception as e:
+                print(f"❌ Erro no reconhecimento: {e}")
+            finally:
+                # Sempre entregar a sequência, senão o despachante espera por ela
+                busy = time.perf_counter() - start
+                self.deliver(sequence, text, stop_event)
+            self.metrics['recognition'].record(busy=busy, blocked=time.perf_counter() - start - busy)
+    
+    def deliver(self, sequence, text, stop_event):
+        """Fila de despacho cheia: a espera fica registrada como backpressure"""
+        while True:
+            try:
+                self.text_queue.put((sequence, text), timeout=0.5)
+                return
+            except queue.Full:
+                if stop_event.is_set():
+                    return
+    
+    def dispatch_loop(self, stop_event):
+        # Workers concorrentes terminam fora de ordem: reordenar pela sequência
+        pending = {}
+        next_sequence = 0
+        
+        while not stop_event.is_set() or not self.text_queue.empty():
+            try:
+                sequence, text = self.text_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            pending[sequence] = text
+            
+            while True:
+                with self.skipped_lock:
+                    if next_sequence in self.skipped:
+                        self.skipped.discard(next_sequence)
+                        next_sequence += 1
+                        continue
+                if next_sequence not in pending:
+                    break
+                
+                text = pending.pop(next_sequence)
+                next_sequence += 1
+                start = time.perf_counter()
+                try:
+                    self.dispatch(text)
+                except Exception as e:
+                    print(f"❌ Erro ao processar comando: {e}")
+                self.metrics['dispatch'].record(busy=time.perf_counter() - start)
+    
+    def get_metrics(self):
+        """Métricas por estágio (profundidade de fila, descartes, tempos)"""
+        return {name: metrics.snapshot() for name, metrics in self.metrics.items()}
+
+class SpeechRequest:
+    """Uma fala pendente na fila do SpeechWorker"""
+    
+    def __init__(self, text, emotion, priority, max_age, cache=False, render_only=False):
+        self.text = text
+        self.emotion = emotion
+        self.priority = priority
+        self.cache = cache
+        self.render_only = render_only
+        self.rate = SPEECH_RATES.get(emotion, 180)
+        # Mesma frase em outra velocidade é outra fala (e outra entrada do cache)
+        self.key = (priority, text, self.rate)
+        self.created = time.perf_counter()
+        self.deadline = self.created + max_age
+        self.cancelled = False
+        self.done = threading.Event()
+
+class SpeechWorker:
+    """Thread única dona do engine TTS, com fila de prioridade"""
+    
+    def __init__(self, engine, max_age=None, cache=None):
+        self.engine = engine
+        self.cache = cache
+        self.voice_id = engine.getProperty('voice')
+        self.audio = None  # PyAudio para tocar falas do cache, criado sob demanda
+        # Após esse tempo na fila a fala perdeu o sentido e é descartada
+        self.max_age = max_age or {PRIORITY_USER: 15.0, PRIORITY_SYSTEM: 10.0, PRIORITY_WARM: 3600.0}
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.lock = threading.Lock()
+        self.pending = {}  # (prioridade, texto, velocidade) -> SpeechRequest, para agrupar repetidas
+        self.current = None  # Fala em andamento
+        self.interruptible = False  # Engine falando direto (engine.stop() é seguro)
+        self.running = False
+        self.thread = None
+        
+        # Métricas
+        self.spoken = 0
+        self.rendered = 0
+        self.coalesced = 0
+        self.stale = 0
+        self.preempted = 0
+        self.wait_time = 0.0
+        self.synthesis_time = 0.0
+    
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+    
+    def stop(self):
+        self.running = False
+        self.queue.put((-1, next(self.sequence), None))
+    
+    def say(self, text, emotion="neutral", priority=PRIORITY_USER, cache=False, render_only=False):
+        """Enfileira fala; notificações idênticas ainda pendentes são agrupadas
+        
+        Resposta ao usuário interrompe a notificação em andamento e descarta
+        as que ainda esperam na fila.
+        """
+        request = SpeechRequest(
+            text, emotion, priority, self.max_age.get(priority, 10.0),
+            cache=cache, render_only=render_only
+        )
+        with self.lock:
+            existing = self.pending.get(request.key)
+            if existing and priority != PRIORITY_USER:
+                self.coalesced += 1
+                return existing
+            self.pending[request.key] = request
+        
+        if priority == PRIORITY_USER and not render_only:
+            self.preempt(priority)
+        self.queue.put((priority, next(self.sequence), request))
+        return request
+    
+    def preempt(self, priority):
+        """Cancela falas audíveis de prioridade menor: pendentes e a em andamento
+        
+        Pré-renderizações (render_only) não são tocadas, então seguem na fila.
+        """
+        for lower in range(priority + 1, PRIORITY_WARM):
+            self.cancel_pending(lower)
+        
+        with self.lock:
+            current = self.current
+            if current is None or current.priority <= priority or current.render_only:
+                return
+            current.cancelled = True  # play_wav para no próximo bloco
+            interruptible = self.interruptible
+        
+        if interruptible:
+            try:
+                self.engine.stop()
+            except Exception as e:
+                print(f"⚠️ Erro ao interromper fala: {e}")
+    
+    def cancel_pending(self, priority=None):
+        """Cancela falas ainda não iniciadas (todas ou de uma prioridade)"""
+        with self.lock:
+            for key, request in list(self.pending.items()):
+                if priority is None or request.priority == priority:
+                    request.cancelled = True
+                    del self.pending[key]
+    
+    def run(self):
+        while self.running:
+            _, _, request = self.queue.get()
+            if request is None:
+                break
+            
+            with self.lock:
+                if self.pending.get(request.key) is request:
+                    del self.pending[request.key]
+                self.current = request
+            
+            now = time.perf_counter()
+            if request.cancelled or now > request.deadline:
+                self.stale += 1
+                self.finish(request)
+                continue
+            
+            rate = request.rate
+            try:
+                if self.cache is not None and (request.cache or request.render_only):
+                    self.speak_cached(request, rate)
+                else:
+                    self.speak_direct(request, rate)
+            except Exception as e:
+                print(f"❌ Erro na síntese de voz: {e}")
+            
+            if request.cancelled:
+                self.preempted += 1
+            elif request.render_only:
+                self.rendered += 1
+            else:
+                self.wait_time += now - request.created
+                self.synthesis_time += time.perf_counter() - now
+                self.spoken += 1
+            self.finish(request)
+    
+    def finish(self, request):
+        with self.lock:
+            self.current = None
+        request.done.set()
+    
+    def speak_direct(self, request, rate):
+        """Fala pelo engine; preempt() pode interromper com engine.stop()"""
+        with self.lock:
+            if request.cancelled:
+                return
+            self.interruptible = True
+        try:
+            self.engine.setProperty('rate', rate)
+            self.engine.say(request.text)
+            self.engine.runAndWait()
+        finally:
+            with self.lock:
+                self.interruptible = False
+    
+    def speak_cached(self, request, rate):
+        """Toca a fala do cache; renderiza para o cache se ainda não existir"""
+        path = self.cache.get(request.text, rate, self.voice_id)
+        if path is None:
+            path = self.cache.reserve_path(request.text, rate, self.voice_id)
+            self.engine.setProperty('rate', rate)
+            self.engine.save_to_file(request.text, path)
+            self.engine.runAndWait()
+            path = self.cache.add(request.text, rate, self.voice_id)
+        
+        if request.render_only:
+            return
+        
+        if path is None or not self.play_wav(path, request):
+            # Driver não gerou WAV utilizável: falar direto
+            self.speak_direct(request, rate)
+    
+    def play_wav(self, path, request=None):
+        """Toca WAV direto na saída de áudio, sem passar pelo engine
+        
+        Com `request`, para entre blocos assim que a fala for cancelada.
+        """
+        try:
+            with wave.open(path, 'rb') as wf:
+                if self.audio is None:
+                    self.audio = pyaudio.PyAudio()
+                stream = self.audio.open(
+                    format=self.audio.get_format_from_width(wf.getsampwidth()),
+                    channels=wf.getnchannels(),
+                    rate=wf.getframerate(),
+                    output=True
+                )
+                try:
+                    data = wf.readframes(4096)
+                    while data and not (request and request.cancelled):
+                        stream.write(data)
+                        data = wf.readframes(4096)
+                finally:
+                    stream.stop_stream()
+                    stream.close()
+            return True
+        except (wave.Error, EOFError, OSError):
+            return False
+    
+    def get_metrics(self):
+        """Tempo de espera na fila, tempo de síntese e descartes"""
+        return {
+            'queue_depth': self.queue.qsize(),
+            'spoken': self.spoken,
+            'rendered': self.rendered,
+            'coalesced': self.coalesced,
+            'stale_dropped': self.stale,
+            'preempted': self.preempted,
+            'avg_wait_ms': round(self.wait_time / self.spoken * 1000, 2) if self.spoken else 0.0,
+            'avg_synthesis_ms': round(self.synthesis_time / self.spoken * 1000, 2) if self.spoken else 0.0
+        }
 
 class VoiceAssistant:
     def __init__(self):
@@ -25,20 +610,69 @@ class VoiceAssistant:
         self.engine.setProperty('rate', 180)
         self.engine.setProperty('volume', 0.9)
         
-        # Fila de comandos
-        self.command_queue = queue.Queue()
+        # Fila de áudio capturado aguardando reconhecimento (limitada)
+        self.command_queue = queue.Queue(maxsize=8)
         self.listening = False
         self.wake_word = "luna"
         
         # Configurações
         self.voice_recognition = True
         self.record_unknown = True
+        self.persistent_stream = True
+        self.pipeline_enabled = True
+        self.recognition_workers = 2
+        self.pipeline = None
+        self.wake_word_gate = True
+        self.wake_word_threshold = 0.6
+        self.preprocess_audio = True
+        self.archive_config = {}
+        self.language = 'pt-BR'
+        self.recognizer_config = {}
+        self.tts_cache = True
+        self.tts_cache_mb = 50
+        
+        # Identificação do locutor: (pcm, taxa, largura) -> voice_hash (definida por quem usa)
+        self.speaker_identifier = None
+        
+        # Microfone aberto durante toda a sessão de escuta
+        self.listener = ContinuousListener(self.microphone, self.recognizer)
         
         # Carregar configurações
         self.load_config()
         
-        # Criar pasta de vozes se não existir
-        os.makedirs('data/voices', exist_ok=True)
+        # Falas frequentes renderizadas uma vez e tocadas do disco
+        self.speech_cache = None
+        if self.tts_cache:
+            self.speech_cache = SpeechCache(max_bytes=self.tts_cache_mb * 1024 * 1024)
+        
+        # Só esta thread usa o engine: sem corrida em setProperty/runAndWait
+        self.speech = SpeechWorker(self.engine, cache=self.speech_cache)
+        self.speech.start()
+        
+        # Serviço de reconhecimento com sessão HTTP persistente (um slot por worker)
+        self.backend, self.stub_server = create_backend(
+            self.recognizer_config,
+            language=self.language,
+            concurrency=self.recognition_workers
+        )
+        
+        # Vozes desconhecidas vão para segmentos contínuos, gravados em segundo plano
+        self.voice_archive = VoiceArchive(
+            'data/voices',
+            segment_bytes=self.archive_config.get('segment_mb', 16) * 1024 * 1024,
+            max_bytes=self.archive_config.get('max_mb', 256) * 1024 * 1024,
+            max_age_days=self.archive_config.get('max_age_days', 30)
+        )
+        self.voice_archive.start()
+        
+        # VAD + corte de silêncio + mono 16 kHz antes do reconhecimento e da gravação
+        self.preprocessor = AudioPreprocessor()
+        
+        # Detector local: só frases com a wake word vão para o reconhecimento online
+        self.wake_word_detector = WakeWordDetector(
+            self.wake_word,
+            threshold=self.wake_word_threshold
+        )
     
     def load_config(self):
         try:
@@ -47,38 +681,56 @@ class VoiceAssistant:
                 self.voice_recognition = config['voice']['voice_recognition']
                 self.record_unknown = config['voice']['record_unknown_voices']
                 self.wake_word = config['voice']['wake_word']
+                self.persistent_stream = config['voice'].get('persistent_stream', True)
+                self.pipeline_enabled = config['voice'].get('pipeline', True)
+                self.recognition_workers = config['voice'].get('recognition_workers', 2)
+                self.wake_word_gate = config['voice'].get('wake_word_gate', True)
+                self.wake_word_threshold = config['voice'].get('wake_word_threshold', 0.6)
+                self.preprocess_audio = config['voice'].get('preprocess_audio', True)
+                self.archive_config = config['voice'].get('archive', {})
+                self.language = config['voice'].get('language', 'pt-BR')
+                self.recognizer_config = config['voice'].get('recognizer', {})
+                self.tts_cache = config['voice'].get('tts_cache', True)
+                self.tts_cache_mb = config['voice'].get('tts_cache_mb', 50)
         except:
             pass
     
-    def speak(self, text, emotion="neutral"):
-        """Fala o texto com emoção"""
+    def speak(self, text, emotion="neutral", priority=PRIORITY_USER, cache=False):
+        """Fala o texto com emoção (enfileirado na thread de TTS)
+        
+        Com cache=True a fala é guardada em disco e reaproveitada nas próximas vezes.
+        """
         if not self.engine:
             return
         
-        # Ajustar velocidade baseado na emoção
-        speed_map = {
-            "excited": 220,
-            "happy": 200,
-            "neutral": 180,
-            "sad": 150,
-            "love": 170
-        }
-        
-        self.engine.setProperty('rate', speed_map.get(emotion, 180))
-        
-        def _speak():
-            self.engine.say(text)
-            self.engine.runAndWait()
+        # Velocidade por emoção é aplicada pela própria thread de TTS
+        return self.speech.say(text, emotion, priority, cache=cache)
+    
+    def warm_speech_cache(self, phrases, emotions=None):
+        """Pré-renderiza frases fixas em segundo plano (menor prioridade da fila)"""
+        if self.speech_cache is None:
+            return
         
-        thread = threading.Thread(target=_speak)
-        thread.start()
-        return thread
+        for text in phrases:
+            for emotion in emotions or SPEECH_RATES:
+                rate = SPEECH_RATES.get(emotion, 180)
+                if not self.speech_cache.contains(text, rate, self.speech.voice_id):
+                    self.speech.say(text, emotion, PRIORITY_WARM, render_only=True)
     
     def listen(self, timeout=5, phrase_time_limit=None):
         """Escuta por comandos"""
         if not self.voice_recognition:
             return None
         
+        audio = self.capture(timeout, phrase_time_limit)
+        return self.recognize(audio) if audio else None
+    
+    def capture(self, timeout=5, phrase_time_limit=None):
+        """Captura uma frase do microfone (sem reconhecer)"""
+        # Stream contínuo já aberto: reaproveitar em vez de reabrir o dispositivo
+        if self.listener.source is not None:
+            return next(self.listener.phrases(timeout=timeout), None)
+        
         with self.microphone as source:
             print("🎤 Escutando...")
             self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
@@ -89,59 +741,165 @@ class VoiceAssistant:
                     timeout=timeout,
                     phrase_time_limit=phrase_time_limit
                 )
-                
-                text = self.recognizer.recognize_google(audio, language='pt-BR')
-                print(f"📝 Reconhecido: {text}")
-                return text.lower()
-                
             except sr.WaitTimeoutError:
                 return None
-            except sr.UnknownValueError:
-                print("❌ Não entendi")
-                return None
-            except sr.RequestError:
-                print("❌ Erro no serviço de reconhecimento")
-                return None
+        
+        return audio
+    
+    def recognize(self, audio):
+        """Converte áudio capturado em texto"""
+        try:
+            text = self.backend.recognize(audio)
+            print(f"📝 Reconhecido: {text}")
+            return text.lower()
+            
+        except sr.UnknownValueError:
+            print("❌ Não entendi")
+            return None
+        except sr.RequestError:
+            print("❌ Erro no serviço de reconhecimento")
+            return None
+    
+    def preprocess(self, audio):
+        """Corta silêncio e converte para mono 16 kHz; None se não houver fala"""
+        if not self.preprocess_audio:
+            return audio
+        
+        result = self.preprocessor.process(audio.frame_data, audio.sample_rate, audio.sample_width)
+        report = self.preprocessor.last_report
+        print(
+            f"✂️ Áudio: {report['input_seconds']}s → {report['output_seconds']}s "
+            f"({report['trimmed_ratio']:.0%} cortado, {report['processing_ms']} ms)"
+        )
+        return sr.AudioData(*result) if result else None
+    
+    def recognize_command(self, audio):
+        """Reconhece apenas frases aprovadas pelo detector local da wake word
+        
+        Devolve (texto, voice_hash do locutor), com None onde não houver resultado.
+        """
+        audio = self.preprocess(audio)
+        if audio is None:
+            return None, None
+        if self.wake_word_gate and not self.wake_word_detector.detect(audio):
+            return None, None
+        
+        text = self.recognize(audio)
+        return text, (self.identify_speaker(audio) if text else None)
+    
+    def identify_speaker(self, audio):
+        """voice_hash de quem falou, pelo embedding acústico da frase"""
+        if self.speaker_identifier is None:
+            return None
+        try:
+            return self.speaker_identifier(audio.frame_data, audio.sample_rate, audio.sample_width)
+        except Exception as e:
+            print(f"⚠️ Erro ao identificar locutor: {e}")
+            return None
+    
+    def enroll_wake_word(self, timeout=5):
+        """Grava uma amostra da wake word para o detector local"""
+        if self.listening:
+            print("⚠️ Desative a escuta contínua para gravar a wake word")
+            return None
+        
+        audio = self.capture(timeout=timeout, phrase_time_limit=2)
+        if audio is None:
+            return None
+        
+        filename = self.wake_word_detector.enroll(audio)
+        print(f"🔑 Amostra da wake word gravada: {filename}")
+        return filename
     
     def record_unknown_voice(self, audio_data):
         """Grava voz desconhecida para análise futura"""
         if not self.record_unknown:
             return
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"data/voices/unknown_{timestamp}.wav"
+        audio_data = self.preprocess(audio_data)
+        if audio_data is None:
+            return
         
-        # Converter audio_data para WAV
-        with wave.open(filename, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(pyaudio.PyAudio().get_sample_size(pyaudio.paInt16))
-            wf.setframerate(16000)
-            wf.writeframes(audio_data.get_wav_data())
+        # PCM já em mono 16 kHz, sem o silêncio; a escrita fica com o arquivador
+        pcm = audio_data.get_raw_data()
+        self.voice_archive.append(pcm, audio_data.sample_rate, audio_data.sample_width)
+        
+        seconds = len(pcm) / (audio_data.sample_rate * audio_data.sample_width)
+        print(f"📼 Voz gravada: {seconds:.1f}s ({self.voice_archive.queue.qsize()} na fila do arquivo)")
+    
+    def capture_phrases(self, keep_running):
+        """Gera frases capturadas enquanto keep_running() for verdadeiro"""
+        if self.persistent_stream:
+            # Um único stream aberto durante toda a sessão
+            with self.listener:
+                yield from self.listener.phrases(keep_running)
+            return
         
-        print(f"📼 Voz gravada: {filename}")
+        while keep_running():
+            audio = self.capture(timeout=3)
+            if audio:
+                yield audio
     
     def start_listening_loop(self, callback):
         """Inicia loop de escuta contínua"""
         self.listening = True
         
+        if self.pipeline_enabled and self.voice_recognition:
+            # Microfone continua ouvindo enquanto frases anteriores são reconhecidas/respondidas
+            print("🎤 Escutando (pipeline)...")
+            self.pipeline = VoicePipeline(
+                self.capture_phrases,
+                self.recognize_command,
+                lambda heard: self.handle_heard(heard, callback),
+                workers=self.recognition_workers,
+                audio_queue=self.command_queue
+            )
+            self.pipeline.start()
+            return
+        
         def listen_loop():
+            if self.persistent_stream and self.voice_recognition:
+                # Um único stream aberto; frases vão direto para o reconhecimento
+                print("🎤 Escutando (microfone contínuo)...")
+                with self.listener:
+                    for audio in self.listener.phrases(lambda: self.listening):
+                        self.handle_heard(self.recognize_command(audio), callback)
+                return
+            
             while self.listening:
-                command = self.listen(timeout=3)
-                if command:
-                    if self.wake_word in command:
-                        # Remover wake word
-                        command = command.replace(self.wake_word, '').strip()
-                        if command:
-                            callback(command)
-                    else:
-                        # Comando sem wake word - gravar para análise
-                        if self.record_unknown:
-                            print(f"🗣️ Voz desconhecida detectada: {command}")
+                self.handle_heard((self.listen(timeout=3), None), callback)
         
         thread = threading.Thread(target=listen_loop)
         thread.daemon = True
         thread.start()
     
+    def handle_heard(self, heard, callback):
+        """Filtra pela wake word e repassa o comando com o locutor: callback(comando, voice_hash)"""
+        command, speaker = heard or (None, None)
+        if command:
+            if self.wake_word in command:
+                # Remover wake word
+                command = command.replace(self.wake_word, '').strip()
+                if command:
+                    callback(command, speaker)
+            else:
+                # Comando sem wake word - gravar para análise
+                if self.record_unknown:
+                    print(f"🗣️ Voz desconhecida detectada: {command}")
+    
+    def close_backend(self):
+        """Fecha a sessão do reconhecimento (e o servidor local, se houver)"""
+        self.backend.close()
+        if self.stub_server:
+            self.stub_server.stop()
+    
+    def get_pipeline_metrics(self):
+        """Métricas do pipeline de voz (vazio se não estiver em uso)"""
+        return self.pipeline.get_metrics() if self.pipeline else {}
+    
     def stop_listening(self):
         """Para o loop de escuta"""
-        self.listening = False
\ No newline at end of file
+        self.listening = False
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
\ No newline at end of file
@@ -1,85 +1,274 @@
 import json
-import os
 import hashlib
+import re
 import time
+import sqlite3
+import threading
+import unicodedata
+import numpy as np
 from datetime import datetime
 from typing import Dict, Any
+from journal_module import Journal
+from profile_store_module import ProfileStore, UserProfile
+from audio_module import pcm_to_float, voice_embedding, EMBEDDING_DIM
+from emotional_memory_module import EmotionalMemory
+
+# Léxico de emoções (palavras inteiras, acentos ignorados)
+EMOTION_KEYWORDS = {
+    'happy': ['feliz', 'alegre', 'contente', 'animado', 'amo', 'adoro'],
+    'sad': ['triste', 'chateado', 'deprimido', 'mal', 'pessimo'],
+    'love': ['amor', 'apaixonado', 'carinho', 'querido', 'amada'],
+    'angry': ['raiva', 'bravo', 'irritado', 'odio', 'puto'],
+    'excited': ['empolgado', 'incrivel', 'maravilhoso', 'uau']
+}
+
+# Emoção vencedora (na ordem) e efeito no nível de amor
+EMOTION_PRIORITY = [('love', 2), ('excited', 1), ('happy', 0.5), ('angry', -1), ('sad', -0.5)]
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def normalize_text(text):
+    """Minúsculas e sem acentos ("Péssimo" → "pessimo")"""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+class EmotionMatcher:
+    """Léxico compilado num índice palavra → emoções
+    
+    O texto é normalizado e quebrado em palavras uma vez; cada palavra (ou
+    sequência, para expressões de várias palavras) é uma consulta ao
+    dicionário, então o custo não cresce com o tamanho do léxico.
+    """
+    
+    def __init__(self, lexicon=None):
+        self.keyword_emotions = {}
+        for emotion, keywords in (lexicon or EMOTION_KEYWORDS).items():
+            for keyword in keywords:
+                key = ' '.join(WORD_PATTERN.findall(normalize_text(keyword)))
+                self.keyword_emotions.setdefault(key, set()).add(emotion)
+        self.max_words = max((key.count(' ') + 1 for key in self.keyword_emotions), default=1)
+    
+    def detect(self, text):
+        """Conjunto de emoções presentes no texto (palavras inteiras)"""
+        words = WORD_PATTERN.findall(normalize_text(text))
+        keyword_emotions = self.keyword_emotions
+        detected = set()
+        for word in words:
+            emotions = keyword_emotions.get(word)
+            if emotions:
+                detected |= emotions
+        
+        for size in range(2, self.max_words + 1):
+            for i in range(len(words) - size + 1):
+                emotions = keyword_emotions.get(' '.join(words[i:i + size]))
+                if emotions:
+                    detected |= emotions
+        return detected
+    
+    @staticmethod
+    def dominant(detected):
+        """(emoção, variação do amor) pela prioridade"""
+        for emotion, love_delta in EMOTION_PRIORITY:
+            if emotion in detected:
+                return emotion, love_delta
+        return 'neutral', 0
+
+class VoiceIndex:
+    """Embeddings unitários numa matriz contígua; busca por cosseno vetorizada"""
+    
+    def __init__(self, dim=EMBEDDING_DIM, capacity=1024):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.keys = []
+        self.positions = {}
+        self.lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def __contains__(self, key):
+        return key in self.positions
+    
+    def get(self, key):
+        position = self.positions.get(key)
+        return None if position is None else self.vectors[position].copy()
+    
+    def add(self, key, vector):
+        """Insere ou substitui o embedding de `key`"""
+        with self.lock:
+            position = self.positions.get(key)
+            if position is None:
+                position = len(self.keys)
+                if position == len(self.vectors):
+                    # Dobrar a capacidade: inserção amortizada O(1)
+                    grown = np.zeros((len(self.vectors) * 2, self.vectors.shape[1]), dtype=np.float32)
+                    grown[:position] = self.vectors[:position]
+                    self.vectors = grown
+                self.keys.append(key)
+                self.positions[key] = position
+            self.vectors[position] = vector
+    
+    def query(self, vector, k=1):
+        """Os k perfis mais parecidos: [(key, similaridade)], do maior para o menor"""
+        with self.lock:
+            count = len(self.keys)
+            if count == 0:
+                return []
+            scores = self.vectors[:count] @ vector
+            k = min(k, count)
+            if k < count:
+                top = np.argpartition(scores, count - k)[count - k:]
+            else:
+                top = np.arange(count)
+            top = top[np.argsort(scores[top])[::-1]]
+            return [(self.keys[i], float(scores[i])) for i in top]
 
 class RecognitionSystem:
     def __init__(self):
         self.database_file = 'database.json'
-        self.voice_profiles = {}
-        self.user_profiles = {}
-        self.emotional_memory = {}
+        self.profiles_file = 'database.db'
+        self.emotional_memory = EmotionalMemory()
         self.love_level = 50  # Nível base de "amor"
+        self.emotion_matcher = EmotionMatcher()
+        
+        # Mesma voz acima deste cosseno: o perfil é atualizado em vez de criar outro
+        # (vozes sintéticas: mesma voz >= 0.77; f0 a 3 semitons de distância <= 0.66)
+        self.voice_match_threshold = 0.7
+        self.voice_index = None  # Montado no primeiro uso
+        self.voice_lock = threading.Lock()  # Busca → mescla → gravação de um locutor
+        
+        # Perfis em SQLite, consultados sob demanda por voice_hash
+        self.profiles = ProfileStore(self.profiles_file)
+        self.voice_profiles = self.profiles.voice_profiles
+        self.user_profiles = self.profiles.user_profiles
+        
+        # Cada alteração é um registro pequeno no diário; o snapshot é refeito em segundo plano
+        self.journal = Journal(self.database_file)
         
         # Carregar dados existentes
-        self.load_database()
+        migrated = self.load_database()
+        self.journal.start(self.snapshot)
+        if migrated:
+            # Snapshot e diário sem os perfis antigos, para não serem reimportados
+            self.journal.compact()
     
     def load_database(self):
-        """Carrega banco de dados"""
-        if os.path.exists(self.database_file):
-            try:
-                with open(self.database_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.voice_profiles = data.get('voice_profiles', {})
-                    self.user_profiles = data.get('user_profiles', {})
-                    self.emotional_memory = data.get('emotional_memory', {})
-                    self.love_level = data.get('love_level', 50)
-            except:
-                self.initialize_database()
-        else:
+        """Carrega banco de dados (snapshot + diário); True se migrou perfis do JSON"""
+        try:
+            # Sem snapshot, o diário (queda antes da primeira compactação) ainda é reaplicado
+            data = self.journal.load()
+        except (ValueError, OSError) as e:
+            print(f"⚠️ Banco de dados ilegível ({e}), criando um novo")
+            data = {}
+        
+        if not data:
             self.initialize_database()
+            return False
+        
+        self.emotional_memory = EmotionalMemory.from_dict(data.get('emotional_memory', {}))
+        self.love_level = data.get('love_level', 50)
+        try:
+            return self.migrate_profiles(data)
+        except sqlite3.Error as e:
+            # Perfis continuam no snapshot; nova tentativa no próximo início
+            print(f"⚠️ Erro ao migrar perfis para {self.profiles_file}: {e}")
+            return False
+    
+    def migrate_profiles(self, data):
+        """Move perfis do formato JSON antigo para o SQLite (uma vez só)"""
+        voice_profiles = data.get('voice_profiles') or {}
+        user_profiles = data.get('user_profiles') or {}
+        if not voice_profiles and not user_profiles:
+            return False
+        
+        self.voice_profiles.upsert_many(voice_profiles.items())
+        self.user_profiles.upsert_many(user_profiles.items())
+        print(f"📦 {len(voice_profiles)} perfis de voz e {len(user_profiles)} usuários migrados para {self.profiles_file}")
+        return True
     
     def initialize_database(self):
         """Inicializa banco de dados"""
         data = {
-            'voice_profiles': {},
-            'user_profiles': {},
             'emotional_memory': {},
             'love_level': 50,
             'created_at': datetime.now().isoformat()
         }
-        self.save_database(data)
+        self.journal.reset(data)
+    
+    def snapshot(self):
+        """Estado do snapshot (perfis ficam no SQLite)"""
+        return {
+            'emotional_memory': self.emotional_memory.to_dict(),
+            'love_level': self.love_level,
+            'updated_at': datetime.now().isoformat()
+        }
     
     def save_database(self, data=None):
-        """Salva banco de dados"""
-        if data is None:
-            data = {
-                'voice_profiles': self.voice_profiles,
-                'user_profiles': self.user_profiles,
-                'emotional_memory': self.emotional_memory,
-                'love_level': self.love_level,
-                'updated_at': datetime.now().isoformat()
-            }
-        
-        with open(self.database_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Salva banco de dados inteiro (snapshot atômico)"""
+        self.journal.write_snapshot(data if data is not None else self.snapshot())
     
-    def analyze_voice_pattern(self, audio_data):
-        """Analisa padrão de voz (simplificado)"""
-        # Em implementação real, usaríamos ML para análise
-        voice_hash = hashlib.md5(audio_data).hexdigest()[:16]
-        
-        if voice_hash not in self.voice_profiles:
-            self.voice_profiles[voice_hash] = {
-                'first_detected': datetime.now().isoformat(),
-                'detection_count': 1,
-                'last_detected': datetime.now().isoformat()
-            }
-        else:
-            self.voice_profiles[voice_hash]['detection_count'] += 1
-            self.voice_profiles[voice_hash]['last_detected'] = datetime.now().isoformat()
+    def close(self):
+        """Grava alterações pendentes, compacta o diário e fecha os perfis"""
+        self.journal.close()
+        self.profiles.close()
+    
+    def get_voice_index(self):
+        """Índice de embeddings, carregado do banco numa única consulta"""
+        with self.voice_lock:
+            return self.load_voice_index()
+    
+    def load_voice_index(self):
+        """Monta o índice se preciso; chamar com voice_lock"""
+        if self.voice_index is None:
+            index = VoiceIndex()
+            for voice_hash, embedding in self.profiles.embeddings():
+                # Embeddings de outra versão (outro tamanho) são reaprendidos
+                if len(embedding) == EMBEDDING_DIM * 4:
+                    index.add(voice_hash, np.frombuffer(embedding, dtype='<f4'))
+            self.voice_index = index
+        return self.voice_index
+    
+    def find_speaker(self, embedding):
+        """voice_hash do perfil mais parecido (ou None abaixo do limiar)"""
+        matches = self.get_voice_index().query(embedding, k=1)
+        if matches and matches[0][1] >= self.voice_match_threshold:
+            return matches[0][0]
+        return None
+    
+    def analyze_voice_pattern(self, audio_data, sample_rate=16000, sample_width=2):
+        """Identifica o locutor pelo embedding acústico; falas da mesma voz se juntam num perfil"""
+        embedding = voice_embedding(pcm_to_float(audio_data, sample_width), sample_rate)
+        if embedding is None:
+            return None
         
-        self.save_database()
+        # Atômico: duas frases de um locutor novo em paralelo não criam dois perfis
+        with self.voice_lock:
+            index = self.load_voice_index()
+            matches = index.query(embedding, k=1)
+            if matches and matches[0][1] >= self.voice_match_threshold:
+                voice_hash = matches[0][0]
+                # Média móvel do perfil (peso limitado para acompanhar mudanças na voz)
+                profile = self.voice_profiles.get(voice_hash)
+                weight = min(profile.detection_count if profile else 1, 50)
+                merged = index.get(voice_hash) * weight + embedding
+                embedding = (merged / np.linalg.norm(merged)).astype(np.float32)
+            else:
+                voice_hash = hashlib.md5(audio_data).hexdigest()[:16]
+            
+            self.profiles.record_detection(voice_hash, int(time.time()))
+            self.profiles.set_embedding(voice_hash, embedding.astype('<f4').tobytes())
+            index.add(voice_hash, embedding)
         return voice_hash
     
-    def recognize_user(self, voice_hash):
-        """Reconhece usuário pelo hash da voz"""
-        if voice_hash in self.user_profiles:
+    def recognize_user(self, voice):
+        """Reconhece usuário pelo hash da voz ou por um embedding"""
+        voice_hash = self.find_speaker(voice) if isinstance(voice, np.ndarray) else voice
+        if voice_hash is not None and voice_hash in self.user_profiles:
             user = self.user_profiles[voice_hash]
             # Aumentar nível de amor por reconhecimento
-            self.increase_love(1)
+            self.remember(None, self.increase_love(1))
             return user
         
         return None
@@ -88,74 +277,101 @@ class RecognitionSystem:
         """Registra novo usuário"""
         user_id = f"user_{len(self.user_profiles) + 1:03d}"
         
-        self.user_profiles[voice_hash] = {
-            'id': user_id,
-            'name': name,
-            'voice_hash': voice_hash,
-            'registered_at': datetime.now().isoformat(),
-            'interaction_count': 1
-        }
+        self.user_profiles[voice_hash] = UserProfile(voice_hash, user_id, name, int(time.time()), 1)
         
-        self.save_database()
         return user_id
     
+    def export_profiles(self, filename):
+        """Exporta perfis no formato JSON original (timestamps ISO-8601)"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            # Escrita em fluxo: só um lote de perfis em memória por vez
+            f.write('{"voice_profiles": {')
+            for i, (voice_hash, profile) in enumerate(self.voice_profiles.items()):
+                f.write(f'{", " if i else ""}{json.dumps(voice_hash)}: ')
+                json.dump(profile.to_dict(), f, ensure_ascii=False)
+            f.write('}, "user_profiles": {')
+            for i, (voice_hash, profile) in enumerate(self.user_profiles.items()):
+                f.write(f'{", " if i else ""}{json.dumps(voice_hash)}: ')
+                json.dump(profile.to_dict(), f, ensure_ascii=False)
+            f.write('}}')
+    
     def analyze_emotion(self, text):
         """Analisa emoção no texto (simplificado)"""
-        emotion_keywords = {
-            'happy': ['feliz', 'alegre', 'contente', 'animado', 'amo', 'adoro'],
-            'sad': ['triste', 'chateado', 'deprimido', 'mal', 'pessimo'],
-            'love': ['amor', 'apaixonado', 'carinho', 'querido', 'amada'],
-            'angry': ['raiva', 'bravo', 'irritado', 'odio', 'puto'],
-            'excited': ['empolgado', 'incrivel', 'maravilhoso', 'uau']
-        }
-        
-        detected_emotions = []
-        text_lower = text.lower()
-        
-        for emotion, keywords in emotion_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    detected_emotions.append(emotion)
-                    break
-        
-        # Prioridade de emoções
-        if 'love' in detected_emotions:
-            self.increase_love(2)
-            return 'love'
-        elif 'excited' in detected_emotions:
-            self.increase_love(1)
-            return 'excited'
-        elif 'happy' in detected_emotions:
-            self.increase_love(0.5)
-            return 'happy'
-        elif 'angry' in detected_emotions:
-            self.decrease_love(1)
-            return 'angry'
-        elif 'sad' in detected_emotions:
-            self.decrease_love(0.5)
-            return 'sad'
+        emotion, love_delta = self.emotion_matcher.dominant(self.emotion_matcher.detect(text))
+        self.remember(emotion, self.change_love(love_delta))
+        return emotion
+    
+    def analyze_emotions(self, texts):
+        """Analisa vários textos de uma vez; o amor é atualizado uma só vez no fim"""
+        emotions = []
+        total_delta = 0
+        for text in texts:
+            emotion, love_delta = self.emotion_matcher.dominant(self.emotion_matcher.detect(text))
+            emotions.append(emotion)
+            total_delta += love_delta
+            self.remember(emotion, 0)
         
-        return 'neutral'
+        # Na memória entra a variação aplicada (limitada a 0–100), não a detectada
+        applied = self.change_love(total_delta)
+        if applied:
+            self.remember(None, applied)
+        return emotions
+    
+    def remember(self, emotion, love_delta):
+        """Registra a interação na memória emocional (O(1)) e no diário, na ordem das sequências"""
+        self.emotional_memory.record(
+            emotion, love_delta,
+            on_event=lambda event: self.journal.append_event(['emotional_memory', 'events'], event)
+        )
+    
+    def get_dominant_emotion(self, window='hour'):
+        """Emoção predominante ultimamente ('hour', 'day' ou 'month')"""
+        return self.emotional_memory.dominant_emotion(window)
+    
+    def get_love_trend(self, window='day'):
+        """Tendência do amor na janela: subindo, caindo ou estável"""
+        trend = self.emotional_memory.love_trend(window)
+        if trend >= 2:
+            return "subindo"
+        elif trend <= -2:
+            return "caindo"
+        return "estável"
+    
+    def change_love(self, amount):
+        """Aplica variação positiva ou negativa do amor; devolve a variação efetiva"""
+        if amount > 0:
+            return self.increase_love(amount)
+        elif amount < 0:
+            return self.decrease_love(-amount)
+        return 0
     
     def increase_love(self, amount):
-        """Aumenta nível de amor"""
+        """Aumenta nível de amor; devolve quanto realmente subiu"""
+        previous = self.love_level
         self.love_level = min(100, self.love_level + amount)
-        self.save_database()
+        self.journal.set(['love_level'], self.love_level)
+        return self.love_level - previous
     
     def decrease_love(self, amount):
-        """Diminui nível de amor"""
+        """Diminui nível de amor; devolve a variação (negativa)"""
+        previous = self.love_level
         self.love_level = max(0, self.love_level - amount)
-        self.save_database()
+        self.journal.set(['love_level'], self.love_level)
+        return self.love_level - previous
     
-    def get_love_status(self):
-        """Retorna status do amor"""
+    def get_love_status(self, with_trend=False):
+        """Retorna status do amor (opcionalmente com a tendência do dia)"""
         if self.love_level >= 90:
-            return "apaixonada"
+            status = "apaixonada"
         elif self.love_level >= 70:
-            return "muito carinhosa"
+            status = "muito carinhosa"
         elif self.love_level >= 50:
-            return "carinhosa"
+            status = "carinhosa"
         elif self.love_level >= 30:
-            return "neutra"
+            status = "neutra"
         else:
-            return "distante"
\ No newline at end of file
+            status = "distante"
+        
+        if with_trend:
+            return f"{status} ({self.get_love_trend()})"
+        return status
\ No newline at end of file
@@ -3,10 +3,17 @@ import time
 import json
 import threading
 import os
+import sys
 from datetime import datetime
 from typing import List, Dict, Any
-import winreg  # Windows only
-import subprocess
+from usb_hotplug_module import UsbHotplugMonitor, read_usb_devices
+from driver_inventory_module import DriverInventory
+from probe_scheduler_module import ProbeScheduler
+
+try:
+    import winreg  # Windows only
+except ImportError:
+    winreg = None
 
 class SystemMonitor:
     def __init__(self):
@@ -14,6 +21,13 @@ class SystemMonitor:
         self.drivers = {}
         self.monitoring = False
         self.callbacks = []
+        self.hotplug = None
+        self.sysfs_root = '/sys'
+        self.inventory = DriverInventory()
+        self.drivers_lock = threading.Lock()  # inventory e drivers: monitor x interface
+        self.scheduler = ProbeScheduler()
+        self.previous_devices = {}
+        self.hotplug_thread = None
         
         # Carregar configurações
         self.load_config()
@@ -29,6 +43,10 @@ class SystemMonitor:
         """Obtém dispositivos USB conectados"""
         devices = []
         
+        # Linux - direto do sysfs
+        if winreg is None and UsbHotplugMonitor.available(self.sysfs_root):
+            return list(read_usb_devices(self.sysfs_root).values())
+        
         try:
             # Windows - via Registry
             access_reg = winreg.ConnectRegistry(None, winreg.HKEY_LOCAL_MACHINE)
@@ -76,30 +94,17 @@ class SystemMonitor:
         return devices
     
     def get_drivers_info(self):
-        """Obtém informações sobre drivers"""
-        drivers = []
+        """Obtém informações sobre drivers (só leitura: as mudanças ficam com o monitor)"""
+        with self.drivers_lock:
+            if self.drivers:
+                return list(self.drivers.values())
         
+        drivers = []
         try:
-            # Windows - lista drivers via WMIC
-            result = subprocess.run(
-                ['wmic', 'path', 'win32_pnpentity', 'get', 'name,status'],
-                capture_output=True,
-                text=True,
-                encoding='utf-8',
-                errors='ignore'
-            )
-            
-            lines = result.stdout.strip().split('\n')
-            for line in lines[1:]:  # Skip header
-                if line.strip():
-                    parts = line.strip().rsplit('  ', 1)
-                    if len(parts) == 2:
-                        name, status = parts
-                        drivers.append({
-                            'name': name.strip(),
-                            'status': status.strip(),
-                            'last_check': datetime.now().isoformat()
-                        })
+            # Windows via WMIC, Linux via /proc/modules e /sys/module
+            now = datetime.now().isoformat()
+            for name, status in self.inventory.read().items():
+                drivers.append({'name': name, 'status': status, 'last_check': now})
         except:
             # Simular dados para outros sistemas
             drivers = [
@@ -109,49 +114,62 @@ class SystemMonitor:
         
         return drivers
     
+    def handle_usb_change(self, event_type, device):
+        """Atualiza a lista e avisa os callbacks"""
+        if event_type == 'usb_connected':
+            print(f"🆕 Novo dispositivo USB: {device['description']}")
+            self.usb_devices[device['id']] = device
+        else:
+            print(f"❌ Dispositivo USB removido: {device['description']}")
+            self.usb_devices.pop(device['id'], None)
+        self.notify_callbacks(event_type, device)
+    
     def monitor_usb_changes(self):
-        """Monitora mudanças em dispositivos USB"""
-        previous_devices = {}
+        """Monitora mudanças em dispositivos USB por eventos do kernel (Linux)"""
+        try:
+            self.hotplug.run(initial=dict(self.usb_devices))
+        except OSError as e:
+            print(f"⚠️ Hotplug USB indisponível ({e}), usando verificação periódica")
+            self.hotplug = None
+            if self.monitoring:
+                self.previous_devices = dict(self.usb_devices)
+                self.register_probe('usb', self.check_usb_changes, self.usb_interval)
+    
+    def check_usb_changes(self):
+        """Verificação periódica de USB (sem hotplug)"""
+        current_devices = {d['id']: d for d in self.get_usb_devices()}
         
-        while self.monitoring:
-            current_devices = {d['id']: d for d in self.get_usb_devices()}
-            
-            # Verificar novos dispositivos
-            for device_id, device in current_devices.items():
-                if device_id not in previous_devices:
-                    print(f"🆕 Novo dispositivo USB: {device['description']}")
-                    self.notify_callbacks('usb_connected', device)
-            
-            # Verificar dispositivos removidos
-            for device_id, device in previous_devices.items():
-                if device_id not in current_devices:
-                    print(f"❌ Dispositivo USB removido: {device['description']}")
-                    self.notify_callbacks('usb_disconnected', device)
-            
-            previous_devices = current_devices
-            time.sleep(2)  # Verificar a cada 2 segundos
+        # Verificar novos dispositivos
+        for device_id, device in current_devices.items():
+            if device_id not in self.previous_devices:
+                self.handle_usb_change('usb_connected', device)
+        
+        # Verificar dispositivos removidos
+        for device_id, device in self.previous_devices.items():
+            if device_id not in current_devices:
+                self.handle_usb_change('usb_disconnected', device)
+        
+        self.previous_devices = current_devices
     
-    def monitor_drivers(self):
-        """Monitora status de drivers"""
-        previous_status = {}
+    def check_drivers(self):
+        """Verifica status de drivers"""
+        with self.drivers_lock:
+            # Inventário igual custa só a comparação do hash
+            changes = self.inventory.check()
+            if changes or len(self.drivers) != len(self.inventory.entries):
+                now = datetime.now().isoformat()
+                self.drivers = {
+                    name: {'name': name, 'status': status, 'last_check': now}
+                    for name, status in self.inventory.entries.items()
+                }
         
-        while self.monitoring:
-            current_drivers = self.get_drivers_info()
-            current_status = {d['name']: d['status'] for d in current_drivers}
-            
-            for driver_name, status in current_status.items():
-                if driver_name in previous_status:
-                    if previous_status[driver_name] != status:
-                        print(f"⚠️ Driver alterado: {driver_name} - {previous_status[driver_name]} -> {status}")
-                        self.notify_callbacks('driver_changed', {
-                            'name': driver_name,
-                            'old_status': previous_status[driver_name],
-                            'new_status': status
-                        })
-                
-                previous_status[driver_name] = status
-            
-            time.sleep(5)  # Verificar a cada 5 segundos
+        for driver_name, old_status, status in changes:
+            print(f"⚠️ Driver alterado: {driver_name} - {old_status} -> {status}")
+            self.notify_callbacks('driver_changed', {
+                'name': driver_name,
+                'old_status': old_status,
+                'new_status': status
+            })
     
     def notify_callbacks(self, event_type, data):
         """Notifica callbacks registrados"""
@@ -165,27 +183,55 @@ class SystemMonitor:
         """Registra callback para eventos"""
         self.callbacks.append(callback)
     
+    def register_probe(self, name, func, interval, **options):
+        """Agenda verificação periódica na thread única do agendador"""
+        return self.scheduler.register(name, func, interval, **options)
+    
     def start_monitoring(self):
         """Inicia monitoramento"""
         if self.monitoring:
             return
         
         self.monitoring = True
+        system_config = self.config.get('system', {})
+        self.usb_interval = system_config.get('usb_interval', 2)
+        
+        if system_config.get('monitor_usb', True):
+            # Linux: eventos do kernel, sem polling
+            use_hotplug = system_config.get('usb_hotplug', True)
+            if use_hotplug and sys.platform.startswith('linux') and UsbHotplugMonitor.available(self.sysfs_root):
+                self.usb_devices = read_usb_devices(self.sysfs_root)
+                self.hotplug = UsbHotplugMonitor(self.handle_usb_change, self.sysfs_root)
+                self.hotplug_thread = threading.Thread(target=self.monitor_usb_changes)
+                self.hotplug_thread.daemon = True
+                self.hotplug_thread.start()
+            else:
+                self.register_probe('usb', self.check_usb_changes, self.usb_interval)
         
-        # Iniciar threads de monitoramento
-        if self.config.get('system', {}).get('monitor_usb', True):
-            usb_thread = threading.Thread(target=self.monitor_usb_changes)
-            usb_thread.daemon = True
-            usb_thread.start()
+        if system_config.get('monitor_drivers', True) and self.inventory.source is not None:
+            self.register_probe('drivers', self.check_drivers, system_config.get('driver_interval', 5))
         
-        if self.config.get('system', {}).get('monitor_drivers', True):
-            driver_thread = threading.Thread(target=self.monitor_drivers)
-            driver_thread.daemon = True
-            driver_thread.start()
+        # Todas as verificações periódicas numa única thread
+        self.scheduler.start()
     
     def stop_monitoring(self):
         """Para monitoramento"""
         self.monitoring = False
+        self.scheduler.stop()
+        if self.hotplug:
+            self.hotplug.stop()
+            self.hotplug = None
+        if self.hotplug_thread:
+            self.hotplug_thread.join(timeout=2)
+            self.hotplug_thread = None
+    
+    def get_monitor_stats(self):
+        """Tempo de execução e prazos perdidos por verificação"""
+        return {
+            'probes': self.scheduler.get_stats(),
+            'drivers': self.inventory.get_stats(),
+            'usb_hotplug': self.hotplug.get_stats() if self.hotplug else None
+        }
     
     def get_system_info(self):
         """Obtém informações do sistema"""
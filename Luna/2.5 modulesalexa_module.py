@@ -42,6 +42,12 @@ class AlexaIntegration:
     
     async def process_alexa_command(self, data: Dict[str, Any], websocket):
         """Processa comando da Alexa"""
+        # Lote de frases: só a emoção de cada uma
+        if 'texts' in data:
+            emotions = self.luna.recognition.analyze_emotions(data['texts'])
+            await websocket.send(json.dumps({'status': 'ok', 'emotions': emotions}))
+            return
+        
         command = data.get('command', '').lower()
         response = {'status': 'ok', 'response': ''}
         
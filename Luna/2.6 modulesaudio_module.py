@@ -0,0 +1,354 @@
+import os
+import wave
+import time
+import numpy as np
+from functools import lru_cache
+
+SAMPLE_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}
+
+def pcm_to_float(frame_data, sample_width, channels=1):
+    """Converte PCM inteiro em float32 mono no intervalo [-1, 1]"""
+    samples = np.frombuffer(frame_data, dtype=SAMPLE_DTYPES[sample_width]).astype(np.float32)
+    samples /= float(2 ** (8 * sample_width - 1))
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels]
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+def float_to_pcm16(samples):
+    """Converte float32 [-1, 1] para bytes PCM 16 bits"""
+    return (np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes()
+
+def read_wav(path):
+    """Lê WAV PCM e devolve (amostras float32 mono, taxa)"""
+    with wave.open(path, 'rb') as wf:
+        frames = wf.readframes(wf.getnframes())
+        return pcm_to_float(frames, wf.getsampwidth(), wf.getnchannels()), wf.getframerate()
+
+def write_wav(path, samples, sample_rate):
+    """Grava amostras float32 como WAV PCM 16 bits mono"""
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(float_to_pcm16(samples))
+
+def resample(samples, source_rate, target_rate=16000):
+    """Reamostragem com filtro anti-aliasing (sinc janelado) ao reduzir a taxa"""
+    if source_rate == target_rate or len(samples) == 0:
+        return samples
+    
+    if target_rate < source_rate:
+        cutoff = target_rate / source_rate / 2  # Frequência normalizada
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hamming(len(taps))
+        samples = np.convolve(samples, kernel / kernel.sum(), mode='same')
+    
+    duration = len(samples) / source_rate
+    target_length = int(round(duration * target_rate))
+    positions = np.arange(target_length) * (source_rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def frame_signal(samples, frame_length, hop):
+    """Janelas sobrepostas (view sem cópia) de formato (quadros, frame_length)"""
+    if len(samples) < frame_length:
+        samples = np.pad(samples, (0, frame_length - len(samples)))
+    count = 1 + (len(samples) - frame_length) // hop
+    return np.lib.stride_tricks.as_strided(
+        samples,
+        shape=(count, frame_length),
+        strides=(samples.strides[0] * hop, samples.strides[0]),
+        writeable=False
+    )
+
+@lru_cache(maxsize=8)
+def mel_filterbank(sample_rate, n_fft, n_mels, f_min=60.0, f_max=4000.0):
+    """Banco de filtros triangulares na escala mel (n_mels, n_fft // 2 + 1)"""
+    f_max = min(f_max, sample_rate / 2)
+    to_mel = lambda f: 2595.0 * np.log10(1.0 + f / 700.0)
+    to_hz = lambda m: 700.0 * (10 ** (m / 2595.0) - 1.0)
+    
+    mel_points = np.linspace(to_mel(f_min), to_mel(f_max), n_mels + 2)
+    bins = np.fft.rfftfreq(n_fft, 1.0 / sample_rate)
+    hz = to_hz(mel_points)
+    
+    bank = np.zeros((n_mels, len(bins)), dtype=np.float32)
+    for i in range(n_mels):
+        left, center, right = hz[i], hz[i + 1], hz[i + 2]
+        rising = (bins - left) / (center - left)
+        falling = (right - bins) / (right - center)
+        bank[i] = np.maximum(0, np.minimum(rising, falling))
+    return bank
+
+def log_mel_features(samples, sample_rate, n_mels=26, frame_ms=25, hop_ms=10):
+    """Log-energia em bandas mel por quadro: (quadros, n_mels)"""
+    frame_length = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    n_fft = 1 << (frame_length - 1).bit_length()
+    
+    frames = frame_signal(np.ascontiguousarray(samples, dtype=np.float32), frame_length, hop)
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(frame_length), n=n_fft)) ** 2
+    energies = spectrum @ mel_filterbank(sample_rate, n_fft, n_mels).T
+    return np.log(energies + 1e-10).astype(np.float32)
+
+def trim_silent_frames(features, floor_db=30.0):
+    """Remove quadros silenciosos do início e do fim"""
+    energy = np.log10(np.exp(features).sum(axis=1)) * 10
+    active = np.flatnonzero(energy > energy.max() - floor_db)
+    if len(active) == 0:
+        return features
+    return features[active[0]:active[-1] + 1]
+
+def normalize_frames(features):
+    """Remove média por banda (CMN) e normaliza cada quadro (cosseno)"""
+    centered = features - features.mean(axis=-2, keepdims=True)
+    norms = np.linalg.norm(centered, axis=-1, keepdims=True)
+    return centered / np.maximum(norms, 1e-8)
+
+def stretch_frames(features, length):
+    """Reamostra a sequência de quadros para `length` por interpolação linear"""
+    positions = np.linspace(0, len(features) - 1, length)
+    low = np.floor(positions).astype(int)
+    high = np.minimum(low + 1, len(features) - 1)
+    weight = (positions - low)[:, None]
+    return features[low] * (1 - weight) + features[high] * weight
+
+def pitch_track(samples, sample_rate, f_min=60.0, f_max=400.0, frame_ms=40, hop_ms=10, voicing=0.5):
+    """f0 (Hz) de cada quadro vozeado, pelo pico da autocorrelação"""
+    frame_length = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    frames = frame_signal(np.ascontiguousarray(samples, dtype=np.float32), frame_length, hop)
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    
+    # Autocorrelação via FFT (com zero padding, sem aliasing circular)
+    n_fft = 2 * frame_length
+    spectrum = np.fft.rfft(frames * np.hanning(frame_length), n=n_fft)
+    autocorrelation = np.fft.irfft(np.abs(spectrum) ** 2, n=n_fft)[:, :frame_length]
+    
+    shortest, longest = int(sample_rate / f_max), int(sample_rate / f_min)
+    lags = shortest + np.argmax(autocorrelation[:, shortest:longest], axis=1)
+    energy = autocorrelation[:, 0]
+    strength = autocorrelation[np.arange(len(frames)), lags] / np.maximum(energy, 1e-12)
+    voiced = (strength > voicing) & (energy > energy.max() * 1e-3)
+    return sample_rate / lags[voiced]
+
+EMBEDDING_MELS = 40
+PITCH_BINS = 37  # Semitons de 55 a 440 Hz
+PITCH_SPREAD = 1.5  # Desvio (semitons) de cada quadro no histograma
+PITCH_WEIGHT = 0.6  # Parte do cosseno que vem do tom de voz
+EMBEDDING_DIM = 2 * EMBEDDING_MELS + PITCH_BINS
+
+def voice_embedding(samples, sample_rate, floor_db=30.0, min_frames=20):
+    """Assinatura de tamanho fixo do locutor (bandas mel + histograma de tom)
+    
+    Média e desvio das bandas mel dos quadros com voz (até `floor_db` abaixo
+    do mais forte), com a média centrada para remover o ganho do microfone.
+    Sozinhas elas dependem mais do que foi dito do que de quem disse, então
+    o histograma de f0 entra com peso PITCH_WEIGHT no cosseno. Devolve vetor
+    unitário float32 de EMBEDDING_DIM posições, ou None se houver pouca voz.
+    """
+    samples = resample(samples, sample_rate)
+    features = log_mel_features(samples, 16000, n_mels=EMBEDDING_MELS)
+    
+    energy = np.log10(np.exp(features).sum(axis=1)) * 10
+    voiced = features[energy > energy.max() - floor_db]
+    if len(voiced) < min_frames:
+        return None
+    
+    mean = voiced.mean(axis=0)
+    spectral = np.concatenate([mean - mean.mean(), voiced.std(axis=0)])
+    
+    pitch = pitch_track(samples, 16000)
+    if len(pitch) < min_frames:
+        return None
+    semitones = 12 * np.log2(pitch / 55.0)
+    histogram = np.exp(-0.5 * ((np.arange(PITCH_BINS) - semitones[:, None]) / PITCH_SPREAD) ** 2).sum(axis=0)
+    
+    spectral_norm = np.linalg.norm(spectral)
+    histogram_norm = np.linalg.norm(histogram)
+    if spectral_norm == 0 or histogram_norm == 0:
+        return None
+    embedding = np.concatenate([
+        spectral / spectral_norm * np.sqrt(1 - PITCH_WEIGHT),
+        histogram / histogram_norm * np.sqrt(PITCH_WEIGHT)
+    ])
+    return embedding.astype(np.float32)
+
+def voice_activity(samples, sample_rate, frame_ms=20, hangover_ms=200):
+    """VAD por energia e taxa de cruzamento por zero; máscara booleana por quadro"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    frames = frame_signal(samples, frame_length, frame_length)
+    
+    energy = np.mean(frames ** 2, axis=1)
+    zero_crossings = np.mean(np.abs(np.diff(np.signbit(frames), axis=1)), axis=1)
+    
+    noise = max(float(np.percentile(energy, 10)), 1e-7)
+    # Vozeado: energia bem acima do ruído; fricativas: energia moderada com muitos cruzamentos
+    speech = (energy > noise * 4) | ((energy > noise * 2) & (zero_crossings > 0.25))
+    
+    # Manter o quadro ativo por um tempo após a fala (evita cortar finais de palavra)
+    hangover = max(1, int(hangover_ms / frame_ms))
+    speech = np.convolve(speech, np.ones(2 * hangover + 1), mode='same') > 0
+    return speech, frame_length
+
+class AudioPreprocessor:
+    """VAD, corte de silêncio, mono e 16 kHz antes do reconhecimento"""
+    
+    def __init__(self, target_rate=16000, min_speech_ms=150):
+        self.target_rate = target_rate
+        self.min_speech_ms = min_speech_ms
+        self.last_report = {}
+        
+        # Acumulado da sessão
+        self.utterances = 0
+        self.input_seconds = 0.0
+        self.output_seconds = 0.0
+        self.total_time = 0.0
+    
+    def process(self, frame_data, sample_rate, sample_width, channels=1):
+        """Devolve (pcm16, taxa, 2) só com o trecho de fala, ou None se não houver fala"""
+        start = time.perf_counter()
+        samples = pcm_to_float(frame_data, sample_width, channels)
+        samples = samples - samples.mean() if len(samples) else samples  # Remover DC
+        input_seconds = len(samples) / sample_rate
+        
+        speech, frame_length = voice_activity(samples, sample_rate)
+        active = np.flatnonzero(speech)
+        if len(active) == 0 or len(active) * frame_length / sample_rate * 1000 < self.min_speech_ms:
+            output = None
+            output_seconds = 0.0
+        else:
+            trimmed = samples[active[0] * frame_length:(active[-1] + 1) * frame_length]
+            trimmed = resample(trimmed, sample_rate, self.target_rate)
+            output = (float_to_pcm16(trimmed), self.target_rate, 2)
+            output_seconds = len(trimmed) / self.target_rate
+        
+        elapsed = time.perf_counter() - start
+        self.utterances += 1
+        self.input_seconds += input_seconds
+        self.output_seconds += output_seconds
+        self.total_time += elapsed
+        self.last_report = {
+            'input_seconds': round(input_seconds, 3),
+            'output_seconds': round(output_seconds, 3),
+            'trimmed_ratio': round(1 - output_seconds / input_seconds, 3) if input_seconds else 0.0,
+            'input_bytes': len(frame_data),
+            'output_bytes': len(output[0]) if output else 0,
+            'processing_ms': round(elapsed * 1000, 3)
+        }
+        return output
+    
+    def get_stats(self):
+        """Resumo acumulado do pré-processamento"""
+        return {
+            'utterances': self.utterances,
+            'trimmed_ratio': round(1 - self.output_seconds / self.input_seconds, 3) if self.input_seconds else 0.0,
+            'avg_ms': round(self.total_time / self.utterances * 1000, 3) if self.utterances else 0.0,
+            'last': self.last_report
+        }
+
+class WakeWordDetector:
+    """Detector local da wake word por comparação com gravações de referência"""
+    
+    def __init__(self, wake_word="luna", template_dir='data/wake_word', threshold=0.6,
+                 stretches=(0.85, 1.0, 1.15), search_seconds=2.0):
+        self.wake_word = wake_word
+        self.template_dir = template_dir
+        self.threshold = threshold
+        self.stretches = stretches
+        self.search_seconds = search_seconds  # Só o início da frase é examinado
+        self.templates = []
+        
+        # Estatísticas
+        self.passed = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        
+        self.load_templates()
+    
+    def load_templates(self):
+        """Carrega gravações de referência (WAV) da pasta de templates"""
+        self.templates = []
+        if not os.path.isdir(self.template_dir):
+            return
+        
+        for file in sorted(os.listdir(self.template_dir)):
+            if file.endswith('.wav'):
+                samples, rate = read_wav(os.path.join(self.template_dir, file))
+                self.add_template(samples, rate)
+    
+    def add_template(self, samples, sample_rate):
+        """Adiciona template já em memória (uma versão por fator de velocidade)"""
+        features = trim_silent_frames(log_mel_features(samples, sample_rate))
+        variants = []
+        for stretch in self.stretches:
+            length = max(2, int(round(len(features) * stretch)))
+            variants.append(normalize_frames(stretch_frames(features, length)))
+        self.templates.append(variants)
+    
+    def enroll(self, audio_data):
+        """Salva uma gravação da wake word (sr.AudioData) como novo template"""
+        os.makedirs(self.template_dir, exist_ok=True)
+        samples = pcm_to_float(audio_data.frame_data, audio_data.sample_width)
+        filename = os.path.join(self.template_dir, f"{self.wake_word}_{time.time_ns()}.wav")
+        write_wav(filename, samples, audio_data.sample_rate)
+        self.add_template(samples, audio_data.sample_rate)
+        return filename
+    
+    @property
+    def ready(self):
+        return bool(self.templates)
+    
+    def score(self, samples, sample_rate):
+        """Maior similaridade (0 a 1) entre algum trecho do áudio e os templates"""
+        samples = samples[:int(self.search_seconds * sample_rate)]
+        features = log_mel_features(samples, sample_rate)
+        
+        best = 0.0
+        for variants in self.templates:
+            for template in variants:
+                length = len(template)
+                if len(features) < length:
+                    continue
+                
+                # Todas as janelas de mesmo tamanho do template, comparadas de uma vez
+                windows = np.lib.stride_tricks.sliding_window_view(features, length, axis=0)
+                windows = normalize_frames(windows.transpose(0, 2, 1))
+                similarity = np.einsum('wlm,lm->w', windows, template) / length
+                best = max(best, float(similarity.max()))
+        return best
+    
+    def detect_samples(self, samples, sample_rate):
+        """True se a wake word aparece no áudio (sem templates, deixa passar)"""
+        if not self.templates:
+            return True
+        
+        start = time.perf_counter()
+        detected = self.score(samples, sample_rate) >= self.threshold
+        self.total_time += time.perf_counter() - start
+        
+        if detected:
+            self.passed += 1
+        else:
+            self.rejected += 1
+        return detected
+    
+    def detect(self, audio_data):
+        """Versão para sr.AudioData"""
+        samples = pcm_to_float(audio_data.frame_data, audio_data.sample_width)
+        return self.detect_samples(samples, audio_data.sample_rate)
+    
+    def detect_wav(self, path):
+        """Versão para arquivos WAV (útil para testes sem microfone nem rede)"""
+        samples, rate = read_wav(path)
+        return self.detect_samples(samples, rate)
+    
+    def get_stats(self):
+        """Quantas frases passaram/foram barradas antes do reconhecimento"""
+        checked = self.passed + self.rejected
+        return {
+            'templates': len(self.templates),
+            'passed': self.passed,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_time / checked * 1000, 3) if checked else 0.0
+        }
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+class SpeechCache:
+    """Cache em disco de falas sintetizadas, com descarte LRU por tamanho"""
+    
+    def __init__(self, directory='data/tts_cache', max_bytes=50 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(directory, 'index.json')
+        self.entries = OrderedDict()  # chave -> {'file', 'size', 'text'}; ordem = uso
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        
+        # Estatísticas
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self.load_index()
+    
+    def load_index(self):
+        """Carrega índice, ignorando entradas cujo arquivo sumiu"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except:
+            entries = []
+        
+        for key, entry in entries:
+            if os.path.exists(os.path.join(self.directory, entry['file'])):
+                self.entries[key] = entry
+                self.total_bytes += entry['size']
+    
+    def save_index(self):
+        """Salva índice na ordem LRU (mais antigo primeiro)"""
+        temp_file = self.index_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entries.items()), f, ensure_ascii=False)
+        os.replace(temp_file, self.index_file)
+    
+    @staticmethod
+    def make_key(text, rate, voice_id):
+        """Chave da fala: (texto, velocidade, voz)"""
+        return hashlib.sha1(f"{voice_id}|{rate}|{text}".encode('utf-8')).hexdigest()
+    
+    def get(self, text, rate, voice_id):
+        """Caminho do áudio em cache (ou None)"""
+        key = self.make_key(text, rate, voice_id)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            path = os.path.join(self.directory, entry['file'])
+            if not os.path.exists(path):
+                self.forget(key)
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return path
+    
+    def contains(self, text, rate, voice_id):
+        return self.make_key(text, rate, voice_id) in self.entries
+    
+    def reserve_path(self, text, rate, voice_id):
+        """Caminho onde a fala deve ser renderizada antes de `add`"""
+        return os.path.join(self.directory, self.make_key(text, rate, voice_id) + '.wav')
+    
+    def add(self, text, rate, voice_id):
+        """Registra arquivo já renderizado em reserve_path e aplica o limite de tamanho"""
+        key = self.make_key(text, rate, voice_id)
+        filename = key + '.wav'
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path):
+            return None
+        
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries[key]['size']
+            
+            size = os.path.getsize(path)
+            self.entries[key] = {'file': filename, 'size': size, 'text': text, 'created': time.time()}
+            self.entries.move_to_end(key)
+            self.total_bytes += size
+            
+            self.evict()
+            self.save_index()
+        return path
+    
+    def forget(self, key):
+        """Remove entrada (e arquivo) do cache"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry['size']
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except OSError:
+            pass
+    
+    def evict(self):
+        """Descarta as falas menos usadas até caber no limite"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            oldest = next(iter(self.entries))
+            self.forget(oldest)
+    
+    def close(self):
+        """Persiste a ordem de uso atual"""
+        with self.lock:
+            self.save_index()
+    
+    def get_stats(self):
+        return {
+            'entries': len(self.entries),
+            'bytes': self.total_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
@@ -0,0 +1,293 @@
+import os
+import glob
+import time
+import wave
+import queue
+import struct
+import hashlib
+import threading
+
+# Registro do índice: offset, tamanho, timestamp, taxa, largura da amostra, hash da voz
+INDEX_RECORD = struct.Struct('<QIdIH8s')
+
+class ArchiveEntry:
+    """Registro de um trecho de voz dentro de um segmento"""
+    
+    __slots__ = ('segment', 'position', 'offset', 'length', 'timestamp',
+                 'sample_rate', 'sample_width', 'voice_hash')
+    
+    def __init__(self, segment, position, offset, length, timestamp, sample_rate, sample_width, voice_hash):
+        self.segment = segment
+        self.position = position
+        self.offset = offset
+        self.length = length
+        self.timestamp = timestamp
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.voice_hash = voice_hash
+    
+    @property
+    def key(self):
+        """Identificador estável para acesso direto: (segmento, posição)"""
+        return (self.segment, self.position)
+    
+    @property
+    def duration(self):
+        return self.length / float(self.sample_rate * self.sample_width)
+
+class VoiceArchive:
+    """Arquivo de vozes desconhecidas em segmentos contínuos com índice compacto
+    
+    Cada segmento é um par `voices_NNNNNN.pcm` (PCM mono concatenado) e
+    `voices_NNNNNN.idx` (registros INDEX_RECORD). Uma única thread escreve,
+    em lotes, com arquivos bufferizados; quem grava só enfileira.
+    """
+    
+    def __init__(self, directory='data/voices', segment_bytes=16 * 1024 * 1024,
+                 max_bytes=256 * 1024 * 1024, max_age_days=30, flush_interval=2.0,
+                 batch_size=32, queue_size=256):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400 if max_age_days else None
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = None
+        self.running = False
+        self.lock = threading.Lock()
+        
+        # Segmento aberto pelo escritor
+        self.segment = None
+        self.data_file = None
+        self.index_file = None
+        self.segment_size = 0
+        self.segment_count = 0
+        
+        # Estatísticas
+        self.archived = 0
+        self.dropped = 0
+        self.removed_segments = 0
+        
+        os.makedirs(directory, exist_ok=True)
+    
+    def segment_path(self, segment, ext):
+        return os.path.join(self.directory, f"voices_{segment:06d}.{ext}")
+    
+    def segments(self):
+        """Números dos segmentos existentes, do mais antigo ao mais novo"""
+        numbers = []
+        for path in glob.glob(os.path.join(self.directory, 'voices_*.idx')):
+            name = os.path.basename(path)[len('voices_'):-len('.idx')]
+            if name.isdigit():
+                numbers.append(int(name))
+        return sorted(numbers)
+    
+    def start(self):
+        """Inicia a thread escritora"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def append(self, pcm, sample_rate, sample_width, timestamp=None):
+        """Enfileira trecho PCM para gravação (não bloqueia quem chama)"""
+        item = (pcm, sample_rate, sample_width, timestamp or time.time())
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Escritor atrasado: descartar o trecho mais antigo
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                self.dropped += 1
+    
+    def run(self):
+        """Loop do escritor: agrupa trechos e grava de uma vez"""
+        last_flush = time.time()
+        last_retention = 0
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                batch = []
+            
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            for item in batch:
+                if item is None:
+                    continue
+                try:
+                    self.write(*item)
+                except Exception as e:
+                    print(f"❌ Erro ao arquivar voz: {e}")
+            
+            now = time.time()
+            if self.data_file and (now - last_flush >= self.flush_interval or not self.running):
+                self.flush()
+                last_flush = now
+            
+            if now - last_retention >= 60:
+                self.enforce_retention()
+                last_retention = now
+        
+        self.close_segment()
+    
+    def open_segment(self):
+        """Abre novo segmento após o último existente"""
+        existing = self.segments()
+        self.segment = existing[-1] + 1 if existing else 0
+        self.data_file = open(self.segment_path(self.segment, 'pcm'), 'ab', buffering=256 * 1024)
+        self.index_file = open(self.segment_path(self.segment, 'idx'), 'ab', buffering=64 * 1024)
+        self.segment_size = 0
+        self.segment_count = 0
+    
+    def close_segment(self):
+        if self.data_file:
+            self.flush()
+            self.data_file.close()
+            self.index_file.close()
+        self.data_file = None
+        self.index_file = None
+        self.segment = None
+    
+    def flush(self):
+        """Dados antes do índice: leitores nunca veem registro sem áudio"""
+        self.data_file.flush()
+        self.index_file.flush()
+    
+    def write(self, pcm, sample_rate, sample_width, timestamp):
+        """Grava um trecho no segmento atual (só a thread escritora chama)"""
+        if self.data_file is None:
+            self.open_segment()
+        elif self.segment_size + len(pcm) > self.segment_bytes and self.segment_count:
+            self.close_segment()
+            self.enforce_retention()
+            self.open_segment()
+        
+        voice_hash = hashlib.sha1(pcm).digest()[:8]
+        self.data_file.write(pcm)
+        self.index_file.write(INDEX_RECORD.pack(
+            self.segment_size, len(pcm), timestamp, sample_rate, sample_width, voice_hash
+        ))
+        self.segment_size += len(pcm)
+        self.segment_count += 1
+        self.archived += 1
+    
+    def enforce_retention(self):
+        """Remove segmentos inteiros antigos ou além do limite de tamanho"""
+        with self.lock:
+            closed = [s for s in self.segments() if s != self.segment]
+            now = time.time()
+            
+            sizes = {}
+            for segment in closed:
+                try:
+                    sizes[segment] = os.path.getsize(self.segment_path(segment, 'pcm'))
+                except OSError:
+                    sizes[segment] = 0
+            total = sum(sizes.values()) + self.segment_size
+            
+            for segment in closed:
+                expired = False
+                if self.max_age:
+                    entries = self.read_index(segment)
+                    newest = entries[-1].timestamp if entries else 0
+                    expired = now - newest > self.max_age
+                
+                if not expired and total <= self.max_bytes:
+                    break
+                
+                for ext in ('pcm', 'idx'):
+                    try:
+                        os.remove(self.segment_path(segment, ext))
+                    except OSError:
+                        pass
+                total -= sizes[segment]
+                self.removed_segments += 1
+    
+    def read_index(self, segment):
+        """Registros de um segmento (só os já descarregados em disco)"""
+        try:
+            with open(self.segment_path(segment, 'idx'), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return []
+        
+        usable = len(data) - len(data) % INDEX_RECORD.size
+        return [
+            ArchiveEntry(segment, position, *fields)
+            for position, fields in enumerate(INDEX_RECORD.iter_unpack(data[:usable]))
+        ]
+    
+    def entries(self, since=None):
+        """Todos os registros, do mais antigo ao mais novo"""
+        result = []
+        for segment in self.segments():
+            for entry in self.read_index(segment):
+                if since is None or entry.timestamp >= since:
+                    result.append(entry)
+        return result
+    
+    def read(self, segment, position):
+        """Acesso direto a um trecho pelo índice: (pcm, registro)"""
+        try:
+            with open(self.segment_path(segment, 'idx'), 'rb') as f:
+                f.seek(position * INDEX_RECORD.size)
+                record = f.read(INDEX_RECORD.size)
+        except OSError:
+            return None
+        if len(record) < INDEX_RECORD.size:
+            return None
+        
+        entry = ArchiveEntry(segment, position, *INDEX_RECORD.unpack(record))
+        with open(self.segment_path(segment, 'pcm'), 'rb') as f:
+            f.seek(entry.offset)
+            pcm = f.read(entry.length)
+        return pcm, entry
+    
+    def export_wav(self, segment, position, filename):
+        """Extrai um trecho para WAV (análise externa)"""
+        result = self.read(segment, position)
+        if result is None:
+            return False
+        
+        pcm, entry = result
+        with wave.open(filename, 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(entry.sample_width)
+            wf.setframerate(entry.sample_rate)
+            wf.writeframes(pcm)
+        return True
+    
+    def close(self):
+        """Grava o que falta na fila e fecha o segmento"""
+        if not self.running:
+            return
+        self.running = False
+        try:
+            self.queue.put_nowait(None)  # Acordar o escritor
+        except queue.Full:
+            pass
+        if self.thread:
+            self.thread.join(timeout=5)
+        self.thread = None
+    
+    def get_stats(self):
+        return {
+            'archived': self.archived,
+            'dropped': self.dropped,
+            'pending': self.queue.qsize(),
+            'segments': len(self.segments()),
+            'removed_segments': self.removed_segments
+        }
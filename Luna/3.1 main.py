@@ -14,12 +14,22 @@ import webbrowser
 
 # Importar módulos
 sys.path.append('modules')
-from animation_module import LunaAnimation
-from voice_module import VoiceAssistant
+from animation_module import LunaAnimation, AnimationCommands, AnimationProcess
+from voice_module import VoiceAssistant, PRIORITY_SYSTEM
 from recognition_module import RecognitionSystem
 from system_module import SystemMonitor
 from alexa_module import AlexaIntegration
 
+# Respostas fixas: sintetizadas uma vez e reaproveitadas do cache de voz
+STATIC_RESPONSES = {
+    "hello": ["Olá! Como você está?", "Oi! Tudo bem?", "Olá, estou aqui!"],
+    "how are you": ["Estou bem, obrigada!", "Me sinto ótima hoje!", "Estou feliz em te ver!"],
+    "love you": ["Eu também te amo!", "Isso me deixa tão feliz!", "Meu coração está quentinho!"]
+}
+FALLBACK_RESPONSE = "Desculpe, não entendi. Pode repetir?"
+
+PROFILES_PER_PAGE = 50
+
 class LunaApp:
     def __init__(self):
         # Configurar CustomTkinter
@@ -36,6 +46,11 @@ class LunaApp:
         self.luna_active = False
         self.animation_thread = None
         self.animation_running = False
+        self.animation_commands = AnimationCommands()
+        self.animation_process = None
+        self.embedded_animation = None
+        self.animation_photo = None
+        self.pending_mouse = None
         self.current_emotion = "neutral"
         self.love_level = 50
         
@@ -61,6 +76,9 @@ class LunaApp:
         self.system = SystemMonitor()
         self.alexa = AlexaIntegration(self)
         
+        # Cada frase reconhecida identifica o locutor pelo embedding da voz
+        self.voice.speaker_identifier = self.recognition.analyze_voice_pattern
+        
         # Registrar callback para eventos do sistema
         self.system.register_callback(self.handle_system_event)
     
@@ -294,58 +312,181 @@ class LunaApp:
     
     def start_animation(self):
         """Inicia animação da Luna"""
+        if self.config.get('animation', {}).get('display_mode') == "embedded":
+            self.start_embedded_animation()
+            return
+        
+        if self.config.get('animation', {}).get('process_mode') == "process":
+            self.start_animation_process()
+            return
+        
+        # Reaproveitar thread pausada em vez de recriar a janela
+        if self.animation_thread and self.animation_thread.is_alive():
+            self.animation_commands.set_emotion(self.current_emotion)
+            self.animation_commands.set_love(self.love_level)
+            self.animation_commands.resume()
+            self.animation_running = True
+            return
+        
+        self.animation_commands.clear()
+        self.animation_commands.set_love(self.love_level)
+        
         def animation_thread():
             self.animation_running = True
-            luna_anim = LunaAnimation(400, 400)
+            luna_anim = LunaAnimation(400, 400, commands=self.animation_commands)
             luna_anim.update_emotion(self.current_emotion)
             luna_anim.run()
+            self.animation_running = False
         
         self.animation_thread = threading.Thread(target=animation_thread)
         self.animation_thread.daemon = True
         self.animation_thread.start()
     
+    def start_animation_process(self):
+        """Inicia animação em processo separado (estado em memória compartilhada)"""
+        if self.animation_process and self.animation_process.is_alive():
+            self.animation_commands.set_emotion(self.current_emotion)
+            self.animation_commands.set_love(self.love_level)
+            self.animation_commands.resume()
+            self.animation_running = True
+            return
+        
+        if self.animation_process is not None:
+            self.log("⚠️ Processo de animação encerrou, reiniciando")
+        
+        self.animation_process = AnimationProcess(400, 400)
+        self.animation_commands = self.animation_process.start(
+            self.current_emotion, self.love_level
+        )
+        self.animation_running = True
+    
+    def start_embedded_animation(self):
+        """Renderiza a animação fora da tela e exibe no animation_canvas"""
+        if self.embedded_animation and self.embedded_animation.running:
+            self.animation_commands.set_emotion(self.current_emotion)
+            self.animation_commands.set_love(self.love_level)
+            self.animation_commands.resume()
+            self.animation_running = True
+            return
+        
+        self.animation_commands.clear()
+        self.animation_commands.set_love(self.love_level)
+        self.embedded_animation = LunaAnimation(
+            400, 400,
+            commands=self.animation_commands,
+            embedded=True
+        )
+        self.embedded_animation.update_emotion(self.current_emotion)
+        self.embedded_animation.active_fps = self.config.get('animation', {}).get('embedded_fps', 30)
+        
+        self.animation_photo = ImageTk.PhotoImage("RGB", (400, 400))
+        self.animation_image_id = self.animation_canvas.create_image(
+            0, 0, anchor="center", image=self.animation_photo
+        )
+        self.animation_canvas.bind("<Configure>", self.center_embedded_animation)
+        self.animation_canvas.bind("<Motion>", self.on_canvas_motion)
+        self.center_embedded_animation()
+        
+        self.animation_running = True
+        self.render_embedded_frame()
+    
+    def center_embedded_animation(self, event=None):
+        """Mantém o quadro centralizado no canvas"""
+        self.animation_canvas.coords(
+            self.animation_image_id,
+            self.animation_canvas.winfo_width() // 2,
+            self.animation_canvas.winfo_height() // 2
+        )
+    
+    def on_canvas_motion(self, event):
+        """Guarda só a última posição do mouse; aplicada no próximo quadro"""
+        animation = self.embedded_animation
+        if not animation:
+            return
+        # Imagem ancorada pelo centro: converter para coordenadas da animação
+        x, y = self.animation_canvas.coords(self.animation_image_id)
+        self.pending_mouse = (
+            event.x - x + animation.width // 2,
+            event.y - y + animation.height // 2
+        )
+    
+    def render_embedded_frame(self):
+        """Avança um quadro e copia para o PhotoImage (ritmo definido pela UI)"""
+        animation = self.embedded_animation
+        if not animation or not animation.running:
+            return
+        
+        if self.pending_mouse:
+            animation.handle_mouse(self.pending_mouse)
+            self.pending_mouse = None
+        
+        animation.process_commands()
+        if not animation.paused:
+            animation.update()
+            self.animation_photo.paste(animation.frame_image())
+        
+        if animation.paused or animation.is_idle():
+            interval = int(1000 / animation.idle_fps)
+        else:
+            interval = int(1000 / animation.active_fps)
+        self.root.after(interval, self.render_embedded_frame)
+    
     def stop_animation(self):
-        """Para animação da Luna"""
+        """Pausa animação da Luna (a thread fica disponível para reuso)"""
+        self.animation_commands.pause()
         self.animation_running = False
     
-    def process_voice_command(self, command):
-        """Processa comando de voz"""
+    def process_voice_command(self, command, speaker=None):
+        """Processa comando de voz (speaker: voice_hash de quem falou, se identificado)"""
         self.log(f"Comando de voz: {command}")
         
+        if speaker:
+            user = self.recognition.recognize_user(speaker)
+            if user:
+                self.log(f"Voz reconhecida: {user.name}")
+        
         # Analisar emoção no comando
         emotion = self.recognition.analyze_emotion(command)
         self.current_emotion = emotion
         
+        # Refletir emoção na animação já no próximo quadro
+        self.animation_commands.set_emotion(emotion)
+        if emotion in ("love", "excited", "happy"):
+            self.animation_commands.burst(emotion=emotion)
+        
         # Atualizar nível de amor
         self.update_love_display()
         
         # Responder ao comando
-        responses = {
-            "hello": ["Olá! Como você está?", "Oi! Tudo bem?", "Olá, estou aqui!"],
-            "how are you": ["Estou bem, obrigada!", "Me sinto ótima hoje!", "Estou feliz em te ver!"],
-            "love you": ["Eu também te amo!", "Isso me deixa tão feliz!", "Meu coração está quentinho!"],
+        responses = dict(STATIC_RESPONSES)
+        responses.update({
             "time": [f"Agora são {datetime.now().strftime('%H:%M')}", f"O relógio marca {datetime.now().strftime('%H:%M:%S')}"],
             "date": [f"Hoje é {datetime.now().strftime('%d/%m/%Y')}", f"Estamos no dia {datetime.now().strftime('%d de %B de %Y')}"]
-        }
+        })
         
         # Encontrar resposta apropriada
         response = None
+        cacheable = False
         for key, possible_responses in responses.items():
             if key in command.lower():
                 response = random.choice(possible_responses)
+                cacheable = key in STATIC_RESPONSES
                 break
         
         if not response:
-            response = "Desculpe, não entendi. Pode repetir?"
+            response = FALLBACK_RESPONSE
+            cacheable = True
         
         # Falar resposta
-        self.voice.speak(response, emotion)
+        self.voice.speak(response, emotion, cache=cacheable)
         self.log(f"Luna respondeu: {response}")
     
     def update_love_display(self):
         """Atualiza display do nível de amor"""
         self.love_level = self.recognition.love_level
         self.love_progress.set(self.love_level / 100)
+        # Taxa de partículas da animação acompanha o amor (thread, processo ou embutida)
+        self.animation_commands.set_love(self.love_level)
         self.love_label.configure(
             text=self.recognition.get_love_status().title()
         )
@@ -365,7 +506,12 @@ class LunaApp:
         
         # Se Luna estiver ativa, notificar por voz
         if self.luna_active:
-            self.voice.speak(f"Evento do sistema: {message.split(': ')[1]}", "neutral")
+            self.voice.speak(
+                f"Evento do sistema: {message.split(': ')[1]}",
+                "neutral",
+                priority=PRIORITY_SYSTEM,
+                cache=True
+            )
     
     def log(self, message):
         """Adiciona mensagem ao console"""
@@ -433,6 +579,28 @@ class LunaApp:
                 self.voice.speak(text, "neutral")
         
         ctk.CTkButton(test_frame, text="Falar", command=test_voice).pack(side="left", padx=5)
+        
+        # Amostras da wake word para o detector local
+        wake_frame = ctk.CTkFrame(window)
+        wake_frame.pack(pady=10, padx=20, fill="x")
+        
+        wake_label = ctk.CTkLabel(
+            wake_frame,
+            text=f"Amostras da wake word: {len(self.voice.wake_word_detector.templates)}"
+        )
+        wake_label.pack(side="left", padx=10)
+        
+        def enroll_wake_word():
+            def _enroll():
+                if self.voice.enroll_wake_word():
+                    self.root.after(0, lambda: wake_label.configure(
+                        text=f"Amostras da wake word: {len(self.voice.wake_word_detector.templates)}"
+                    ))
+            
+            self.log(f"Diga \"{self.voice.wake_word}\" para gravar uma amostra")
+            threading.Thread(target=_enroll, daemon=True).start()
+        
+        ctk.CTkButton(wake_frame, text="Gravar amostra", command=enroll_wake_word).pack(side="left", padx=5)
     
     def show_recognition_window(self):
         """Mostra janela de reconhecimento"""
@@ -454,12 +622,37 @@ class LunaApp:
             text="Perfis de Voz Reconhecidos"
         ).pack(pady=10)
         
-        # Lista de vozes
+        # Lista de vozes (paginada: só a página visível é lida do banco)
         voices_text = ctk.CTkTextbox(tabview.tab("Voz"), height=200)
         voices_text.pack(pady=10, padx=10, fill="both", expand=True)
         
-        for voice_hash, data in self.recognition.voice_profiles.items():
-            voices_text.insert("end", f"Voz {voice_hash[:8]}...\n")
+        pager = ctk.CTkFrame(tabview.tab("Voz"))
+        pager.pack(pady=5)
+        page_label = ctk.CTkLabel(pager, text="")
+        current_page = [0]
+        
+        def show_page(page):
+            total = len(self.recognition.voice_profiles)
+            pages = max(1, (total + PROFILES_PER_PAGE - 1) // PROFILES_PER_PAGE)
+            page = max(0, min(page, pages - 1))
+            current_page[0] = page
+            
+            voices_text.delete("1.0", "end")
+            for voice_hash, data in self.recognition.voice_profiles.page(page * PROFILES_PER_PAGE, PROFILES_PER_PAGE):
+                voices_text.insert("end", f"Voz {voice_hash[:8]}... ({data.detection_count}x)\n")
+            page_label.configure(text=f"Página {page + 1}/{pages} ({total} vozes)")
+        
+        ctk.CTkButton(
+            pager, text="◀", width=40,
+            command=lambda: show_page(current_page[0] - 1)
+        ).pack(side="left", padx=5)
+        page_label.pack(side="left", padx=10)
+        ctk.CTkButton(
+            pager, text="▶", width=40,
+            command=lambda: show_page(current_page[0] + 1)
+        ).pack(side="left", padx=5)
+        
+        show_page(0)
         
         # Aba Emoções
         emotions = ["feliz", "triste", "amor", "excitado", "neutro"]
@@ -579,7 +772,8 @@ class LunaApp:
         ⭐ Estatísticas da Luna ⭐
         
         Nível de Amor: {self.love_level}/100
-        Status: {self.recognition.get_love_status()}
+        Status: {self.recognition.get_love_status(with_trend=True)}
+        Emoção Predominante (hoje): {self.recognition.get_dominant_emotion('day')}
         
         Vozes Reconhecidas: {len(self.recognition.voice_profiles)}
         Usuários Registrados: {len(self.recognition.user_profiles)}
@@ -639,6 +833,10 @@ class LunaApp:
         # Iniciar integração Alexa
         self.alexa.start()
         
+        # Pré-renderizar falas fixas no cache de voz
+        static_phrases = [text for options in STATIC_RESPONSES.values() for text in options]
+        self.voice.warm_speech_cache(static_phrases + [FALLBACK_RESPONSE])
+        
         # Iniciar atualização periódica
         self.periodic_update()
     
@@ -663,7 +861,16 @@ class LunaApp:
         if messagebox.askokcancel("Sair", "Deseja realmente sair?"):
             # Parar todos os serviços
             self.luna_active = False
+            self.animation_commands.stop()
+            if self.animation_process:
+                self.animation_process.stop()
             self.voice.stop_listening()
+            self.voice.speech.stop()
+            if self.voice.speech_cache:
+                self.voice.speech_cache.close()
+            self.voice.voice_archive.close()
+            self.voice.close_backend()
+            self.recognition.close()
             self.system.stop_monitoring()
             self.alexa.stop()
             
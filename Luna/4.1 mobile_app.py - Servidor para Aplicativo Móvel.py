@@ -38,6 +38,16 @@ class MobileServer:
             
             return jsonify({'status': 'error', 'message': 'No command'})
         
+        @self.app.route('/api/emotions', methods=['POST'])
+        def analyze_emotions():
+            data = request.json
+            texts = data.get('texts', [])
+            
+            if texts:
+                return jsonify({'emotions': self.luna.recognition.analyze_emotions(texts)})
+            
+            return jsonify({'status': 'error', 'message': 'No texts'})
+        
         @self.app.route('/api/speak', methods=['POST'])
         def speak():
             data = request.json
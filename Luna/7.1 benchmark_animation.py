@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Sem janela: driver de vídeo "dummy" do SDL (precisa vir antes do pygame)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # JSON limpo no stdout
+
+import numpy as np
+
+# Importar módulos
+sys.path.append('modules')
+from animation_module import LunaAnimation
+from benchmark_module import summarize, add_output_argument, write_report
+
+PARTICLE_COUNTS = [0, 100, 1000, 10000]
+
+def timed(samples, func):
+    """Envolve método da animação registrando a duração de cada chamada"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+        return result
+    return wrapper
+
+def top_up_particles(animation, target):
+    """Mantém a contagem de partículas fixa entre quadros"""
+    missing = target - len(animation.particles)
+    if missing > 0:
+        animation.particles.emit(animation.luna_x, animation.luna_y, missing, (255, 255, 255))
+
+def reset(animation, emotion, seed):
+    """Estado inicial idêntico para cada cenário"""
+    random.seed(seed)
+    animation.particles.rng = np.random.default_rng(seed)
+    animation.particles.clear()
+    animation.luna_x = animation.width // 2
+    animation.luna_y = animation.height // 2
+    animation.luna_pulse = 0
+    animation.full_redraw = True
+    animation.previous_rects = []
+    animation.update_emotion(emotion)
+
+TRACEMALLOC_FILTER = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+def traced_snapshot():
+    """Snapshot do tracemalloc sem os blocos do próprio tracemalloc"""
+    return tracemalloc.take_snapshot().filter_traces(TRACEMALLOC_FILTER)
+
+def new_blocks(before, after):
+    """Blocos alocados entre os snapshots e ainda vivos (soma dos count_diff positivos)
+    
+    Alocações liberadas dentro do próprio quadro não aparecem aqui; o custo
+    delas entra no pico de bytes.
+    """
+    stats = after.compare_to(before, 'traceback')
+    return sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+
+def run_scenario(animation, emotion, particles, frames, seed):
+    """Mede tempos e alocações de um par emoção/partículas"""
+    update_samples, gota_samples, particle_samples = [], [], []
+    
+    draw_luna_gota = animation.draw_luna_gota
+    draw_particles = animation.draw_particles
+    animation.draw_luna_gota = timed(gota_samples, draw_luna_gota)
+    animation.draw_particles = timed(particle_samples, draw_particles)
+    
+    # Passada de tempo
+    reset(animation, emotion, seed)
+    for _ in range(frames):
+        top_up_particles(animation, particles)
+        start = time.perf_counter()
+        animation.update()
+        update_samples.append(time.perf_counter() - start)
+    
+    animation.draw_luna_gota = draw_luna_gota
+    animation.draw_particles = draw_particles
+    
+    # Passada de alocações (separada, tracemalloc distorce os tempos)
+    reset(animation, emotion, seed)
+    blocks = []
+    peaks = []
+    tracemalloc.start()
+    for _ in range(frames):
+        top_up_particles(animation, particles)
+        before = traced_snapshot()
+        before_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        animation.update()
+        _, peak = tracemalloc.get_traced_memory()
+        after = traced_snapshot()
+        blocks.append(new_blocks(before, after))
+        peaks.append(peak - before_bytes)
+    tracemalloc.stop()
+    
+    return {
+        'emotion': emotion,
+        'particles': particles,
+        'render_mode': animation.render_mode,
+        'update_ms': summarize(update_samples),
+        'draw_luna_gota_ms': summarize(gota_samples),
+        'draw_particles_ms': summarize(particle_samples),
+        'new_blocks_per_frame': round(sum(blocks) / frames, 2),
+        'peak_alloc_bytes_per_frame': round(sum(peaks) / frames, 1)
+    }
+
+def main():
+    """Benchmark da animação sem janela, saída em JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark da animação da Luna")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--particles', type=int, nargs='+', default=PARTICLE_COUNTS)
+    parser.add_argument('--emotions', nargs='+', default=None)
+    parser.add_argument('--render-mode', choices=['dirty', 'full'], default=None)
+    add_output_argument(parser)
+    args = parser.parse_args()
+    
+    animation = LunaAnimation(400, 400, max_particles=max(args.particles) + 64)
+    animation.particles.budget = animation.particles.capacity  # Ignorar max_particles do config
+    animation.auto_animations = True
+    animation.active_fps = 0  # Sem limite de quadros
+    animation.idle_delay = float('inf')  # Nunca entrar em repouso
+    if args.render_mode:
+        animation.render_mode = args.render_mode
+    
+    emotions = args.emotions or list(animation.emotion_colors)
+    results = []
+    for emotion in emotions:
+        for particles in args.particles:
+            print(f"⏱️ {emotion} / {particles} partículas", file=sys.stderr)
+            results.append(run_scenario(animation, emotion, particles, args.frames, args.seed))
+    
+    report = {
+        'benchmark': 'animation',
+        'frames': args.frames,
+        'seed': args.seed,
+        'video_driver': os.environ.get("SDL_VIDEODRIVER"),
+        'size': [animation.width, animation.height],
+        'results': results
+    }
+    
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
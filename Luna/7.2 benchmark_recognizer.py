@@ -0,0 +1,77 @@
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import speech_recognition as sr
+
+# Importar módulos
+sys.path.append('modules')
+from recognizer_module import StubBackend, StubRecognitionServer
+from benchmark_module import summarize, add_output_argument, write_report
+
+def make_audio(seconds, seed):
+    """Frase sintética em mono 16 kHz"""
+    rng = np.random.default_rng(seed)
+    samples = (rng.standard_normal(int(16000 * seconds)) * 3000).astype('<i2')
+    return sr.AudioData(samples.tobytes(), 16000, 2)
+
+def run_scenario(server, audio, requests, concurrency):
+    """Dispara `requests` reconhecimentos com `concurrency` em paralelo"""
+    backend = StubBackend(server.url, concurrency=concurrency)
+    before = server.get_stats()
+    latencies = []
+    
+    def one(_):
+        start = time.perf_counter()
+        backend.recognize(audio)
+        latencies.append(time.perf_counter() - start)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    backend.close()
+    
+    after = server.get_stats()
+    return {
+        'concurrency': concurrency,
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 2),
+        'latency_ms': summarize(latencies, digits=3),
+        'connections_opened': after['connections'] - before['connections'],
+        'backend': backend.get_stats()
+    }
+
+def main():
+    """Benchmark do reconhecimento contra o servidor local, saída em JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark do backend de reconhecimento")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--latency', type=float, default=0.02, help="Latência simulada do servidor (s)")
+    parser.add_argument('--seconds', type=float, default=2.0, help="Duração de cada frase (s)")
+    parser.add_argument('--seed', type=int, default=42)
+    add_output_argument(parser)
+    args = parser.parse_args()
+    
+    server = StubRecognitionServer(latency=args.latency).start()
+    audio = make_audio(args.seconds, args.seed)
+    
+    results = []
+    for concurrency in args.concurrency:
+        print(f"⏱️ {concurrency} em paralelo", file=sys.stderr)
+        results.append(run_scenario(server, audio, args.requests, concurrency))
+    server.stop()
+    
+    report = {
+        'benchmark': 'recognizer',
+        'server_latency_ms': args.latency * 1000,
+        'audio_seconds': args.seconds,
+        'results': results
+    }
+    
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
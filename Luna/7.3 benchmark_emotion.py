@@ -0,0 +1,88 @@
+import sys
+import time
+import random
+import argparse
+
+# Importar módulos
+sys.path.append('modules')
+from recognition_module import EMOTION_KEYWORDS, EmotionMatcher
+from benchmark_module import add_output_argument, write_report
+
+LEXICON_SIZES = [28, 280, 2800]
+
+SENTENCES = [
+    "luna eu te amo muito",
+    "hoje estou péssimo e muito triste",
+    "que dia incrível, estou empolgado",
+    "me conta que horas são",
+    "estou com raiva do computador",
+    "você é minha querida assistente"
+]
+
+def legacy_detect(text, lexicon):
+    """Implementação anterior: busca de substring palavra por palavra"""
+    detected_emotions = []
+    text_lower = text.lower()
+    for emotion, keywords in lexicon.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                detected_emotions.append(emotion)
+                break
+    return detected_emotions
+
+def grow_lexicon(size, seed):
+    """Léxico real + palavras sintéticas até `size` palavras"""
+    rng = random.Random(seed)
+    lexicon = {emotion: list(keywords) for emotion, keywords in EMOTION_KEYWORDS.items()}
+    emotions = list(lexicon)
+    total = sum(len(keywords) for keywords in lexicon.values())
+    while total < size:
+        word = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10)))
+        lexicon[rng.choice(emotions)].append(word)
+        total += 1
+    return lexicon
+
+def per_call_us(func, texts, repeat):
+    """Custo médio por chamada em microssegundos"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return round((time.perf_counter() - start) / (repeat * len(texts)) * 1e6, 3)
+
+def main():
+    """Micro-benchmark do detector de emoções, saída em JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark do detector de emoções")
+    parser.add_argument('--sizes', type=int, nargs='+', default=LEXICON_SIZES)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    add_output_argument(parser)
+    args = parser.parse_args()
+    
+    results = []
+    for size in args.sizes:
+        print(f"⏱️ léxico com {size} palavras", file=sys.stderr)
+        lexicon = grow_lexicon(size, args.seed)
+        
+        start = time.perf_counter()
+        matcher = EmotionMatcher(lexicon)
+        compile_ms = (time.perf_counter() - start) * 1000
+        
+        results.append({
+            'lexicon_size': sum(len(keywords) for keywords in lexicon.values()),
+            'compile_ms': round(compile_ms, 3),
+            'legacy_us': per_call_us(lambda text: legacy_detect(text, lexicon), SENTENCES, args.repeat),
+            'compiled_us': per_call_us(matcher.detect, SENTENCES, args.repeat)
+        })
+    
+    report = {
+        'benchmark': 'emotion',
+        'sentences': len(SENTENCES),
+        'repeat': args.repeat,
+        'results': results
+    }
+    
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import gc
+import sys
+import time
+import hashlib
+import argparse
+import tracemalloc
+from datetime import datetime
+
+# Importar módulos
+sys.path.append('modules')
+from profile_store_module import VoiceProfile
+from benchmark_module import add_output_argument, write_report
+
+PROFILE_COUNTS = [10000, 100000, 1000000]
+
+def make_hashes(count):
+    return [hashlib.md5(str(i).encode()).hexdigest()[:16] for i in range(count)]
+
+def build_legacy(hashes):
+    """Formato anterior: dicts aninhados com timestamps ISO-8601"""
+    profiles = {}
+    for voice_hash in hashes:
+        profiles[voice_hash] = {
+            'first_detected': datetime.now().isoformat(),
+            'detection_count': 1,
+            'last_detected': datetime.now().isoformat()
+        }
+    return profiles
+
+def build_records(hashes):
+    """Registros com __slots__ e epoch inteiro"""
+    now = int(time.time())
+    return {voice_hash: VoiceProfile(voice_hash, now, now, 1) for voice_hash in hashes}
+
+def update_legacy(profiles, voice_hash):
+    profile = profiles[voice_hash]
+    profile['detection_count'] += 1
+    profile['last_detected'] = datetime.now().isoformat()
+
+def update_records(profiles, voice_hash):
+    profile = profiles[voice_hash]
+    profile.detection_count += 1
+    profile.last_detected = int(time.time())
+
+def measure(build, update, hashes, updates):
+    """Bytes por perfil (tracemalloc) e custo de uma detecção"""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    profiles = build(hashes)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    sample = hashes[:updates]
+    start = time.perf_counter()
+    for voice_hash in sample:
+        update(profiles, voice_hash)
+    elapsed = time.perf_counter() - start
+    
+    result = {
+        'bytes_per_profile': round((after - before) / len(hashes), 1),
+        'total_mb': round((after - before) / 1024 / 1024, 2),
+        'update_ns': round(elapsed / len(sample) * 1e9, 1)
+    }
+    del profiles
+    gc.collect()
+    return result
+
+def main():
+    """Memória e custo de atualização dos perfis, saída em JSON"""
+    parser = argparse.ArgumentParser(description="Benchmark de memória dos perfis")
+    parser.add_argument('--counts', type=int, nargs='+', default=PROFILE_COUNTS)
+    parser.add_argument('--updates', type=int, default=10000)
+    add_output_argument(parser)
+    args = parser.parse_args()
+    
+    results = []
+    for count in args.counts:
+        print(f"⏱️ {count} perfis", file=sys.stderr)
+        hashes = make_hashes(count)
+        # Chaves fora da medição: as duas representações usam as mesmas strings
+        legacy = measure(build_legacy, update_legacy, hashes, args.updates)
+        records = measure(build_records, update_records, hashes, args.updates)
+        results.append({
+            'profiles': count,
+            'legacy_dict': legacy,
+            'slots_record': records,
+            'memory_ratio': round(legacy['bytes_per_profile'] / records['bytes_per_profile'], 2)
+        })
+    
+    report = {
+        'benchmark': 'profiles',
+        'python': sys.version.split()[0],
+        'results': results
+    }
+    
+    write_report(report, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import os
+import sys
+import glob
+import importlib.abc
+import importlib.util
+
+LUNA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class LunaModuleFinder(importlib.abc.MetaPathFinder):
+    """Importa "2.N modules<nome>.py" como <nome>, como faz a pasta modules/ instalada"""
+    
+    def find_spec(self, fullname, path=None, target=None):
+        if '.' in fullname:
+            return None
+        matches = glob.glob(os.path.join(glob.escape(LUNA_DIR), f"* modules{fullname}.py"))
+        if not matches:
+            return None
+        return importlib.util.spec_from_file_location(fullname, matches[0])
+
+if not any(isinstance(finder, LunaModuleFinder) for finder in sys.meta_path):
+    sys.meta_path.append(LunaModuleFinder())
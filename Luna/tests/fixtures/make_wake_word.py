@@ -0,0 +1,60 @@
+"""Gera as gravações sintéticas usadas em test_wake_word.py
+
+Cada "palavra" é uma sequência de vogais (harmônicos de f0 moldados por
+formantes). Positivos repetem a sequência da wake word com outra
+velocidade, ganho, tom e ruído; negativos usam outra sequência ou só ruído.
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+import conftest  # noqa: F401  (registra os módulos do Luna)
+from audio_module import write_wav
+
+SAMPLE_RATE = 16000
+DIRECTORY = os.path.join(os.path.dirname(__file__), 'wake_word')
+
+# Formantes aproximados (F1, F2) de cada vogal/consoante sonora
+FORMANTS = {
+    'l': (360, 1300), 'u': (320, 800), 'n': (280, 1700), 'a': (750, 1300),
+    'k': (500, 2500), 's': (2500, 3500), 'e': (450, 2000), 'o': (500, 900),
+    'i': (280, 2300)
+}
+
+def vowel(formants, duration, f0, rng):
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    f0_track = f0 * (1 + 0.03 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0_track) / SAMPLE_RATE
+    signal = np.zeros_like(t)
+    for harmonic in range(1, int(3800 / f0)):
+        frequency = harmonic * f0
+        gain = sum(np.exp(-((frequency - f) / 120.0) ** 2) for f in formants) + 0.02
+        signal += gain * np.sin(harmonic * phase + rng.uniform(0, 2 * np.pi))
+    return signal
+
+def word(sequence, speed=1.0, f0=180.0, gain=0.5, noise=0.005, seed=0):
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(0.15 * SAMPLE_RATE))]
+    for phone in sequence:
+        parts.append(vowel(FORMANTS[phone], 0.12 / speed, f0, rng))
+    parts.append(np.zeros(int(0.15 * SAMPLE_RATE)))
+    signal = np.concatenate(parts)
+    signal = gain * signal / np.abs(signal).max()
+    return (signal + rng.normal(0, noise, len(signal))).astype(np.float32)
+
+FIXTURES = {
+    'templates/luna.wav': word('luna'),
+    'positive/slow.wav': word('luna', speed=0.9, f0=170, gain=0.3, seed=1),
+    'positive/fast.wav': word('luna', speed=1.1, f0=195, gain=0.8, seed=2),
+    'positive/noisy.wav': word('luna', noise=0.02, seed=3),
+    'negative/casa.wav': word('kasa', seed=4),
+    'negative/oiei.wav': word('oiei', seed=5),
+    'negative/noise.wav': np.random.default_rng(6).normal(0, 0.1, SAMPLE_RATE).astype(np.float32)
+}
+
+if __name__ == "__main__":
+    for name, samples in FIXTURES.items():
+        os.makedirs(os.path.dirname(os.path.join(DIRECTORY, name)), exist_ok=True)
+        write_wav(os.path.join(DIRECTORY, name), samples, SAMPLE_RATE)
+        print(name)
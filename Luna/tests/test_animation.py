@@ -0,0 +1,92 @@
+import os
+import math
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pytest
+import pygame
+
+from animation_module import LunaAnimation
+
+def draw_gota_direct(screen, x, y, size, color, phase, mouth, blink):
+    """Desenho direto na tela, como antes do atlas (referência)"""
+    points = []
+    for i in range(36):
+        angle = (i / 36) * 2 * math.pi
+        radius = size * (1 + 0.1 * math.sin(phase + i * 0.2))
+        if i < 18:
+            radius *= 0.8
+        points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
+    
+    for i in range(len(points)):
+        pygame.draw.line(screen, color, points[i], points[(i + 1) % len(points)], 3)
+    pygame.draw.polygon(screen, (*color, 150), points)
+    
+    eye_offset = size * 0.3
+    eye_size = size * 0.1
+    eye_y = y - eye_offset * 0.5
+    pygame.draw.circle(screen, (0, 0, 0), (int(x - eye_offset), int(eye_y)), int(eye_size * blink))
+    pygame.draw.circle(screen, (0, 0, 0), (int(x + eye_offset), int(eye_y)), int(eye_size * blink))
+    
+    mouth_y = y + eye_offset * 0.5
+    if mouth == "happy":
+        pygame.draw.arc(screen, (0, 0, 0), (x - eye_offset, mouth_y - eye_size, eye_offset * 2, eye_size * 2), 0, math.pi, 2)
+    elif mouth == "love":
+        heart_size = eye_size
+        pygame.draw.polygon(screen, (255, 105, 180), [
+            (x, mouth_y),
+            (x - heart_size, mouth_y - heart_size),
+            (x - heart_size * 0.5, mouth_y - heart_size * 1.5),
+            (x, mouth_y - heart_size),
+            (x + heart_size * 0.5, mouth_y - heart_size * 1.5),
+            (x + heart_size, mouth_y - heart_size),
+        ])
+
+@pytest.fixture(scope='module')
+def animation():
+    animation = LunaAnimation(400, 400, embedded=True)
+    yield animation
+    pygame.quit()
+
+@pytest.mark.parametrize('emotion', ['love', 'happy', 'neutral'])
+@pytest.mark.parametrize('blink', [1, 0.1])
+def test_atlas_sprite_matches_direct_draw(animation, emotion, blink):
+    color = animation.emotion_colors[emotion]
+    mouth = emotion if emotion in ("happy", "love") else None
+    phase = 3 * 2 * math.pi / animation.atlas_phases
+    background = animation.background
+    
+    expected = pygame.Surface((animation.width, animation.height))
+    expected.fill(background)
+    draw_gota_direct(expected, animation.luna_x, animation.luna_y, animation.luna_size, color, phase, mouth, blink)
+    
+    actual = pygame.Surface((animation.width, animation.height))
+    actual.fill(background)
+    half = animation.gota_extent()
+    sprite = animation.render_gota_sprite(color, phase, mouth, blink)
+    actual.blit(sprite, (animation.luna_x - half, animation.luna_y - half))
+    
+    # Corpo opaco: o centro tem a cor da emoção, sem mistura com o fundo
+    if mouth is None:
+        assert actual.get_at((animation.luna_x, animation.luna_y))[:3] == color
+    
+    differing = [
+        (x, y)
+        for x in range(animation.width)
+        for y in range(animation.height)
+        if actual.get_at((x, y)) != expected.get_at((x, y))
+    ]
+    assert differing == []
+
+def test_set_love_command_reaches_animation(animation):
+    animation.commands.set_love(95)
+    animation.process_commands()
+    assert animation.love_level == 95
+
+def test_pipe_commands_set_love_uses_shared_state():
+    from animation_module import PipeCommands, SharedAnimationState
+    state = SharedAnimationState()
+    PipeCommands(connection=None, state=state).set_love(80)
+    assert state.love_level == 80
@@ -0,0 +1,70 @@
+import pytest
+import numpy as np
+
+pytest.importorskip('pyttsx3')
+pytest.importorskip('pyaudio')
+
+from voice_module import ContinuousListener
+
+RATE = 16000
+CHUNK = 1024
+
+def noise(seconds, rms, rng):
+    samples = rng.normal(0, rms, int(seconds * RATE))
+    return np.clip(samples, -32768, 32767).astype(np.int16)
+
+def speech(seconds, rms):
+    """Vogal sintética: f0 de 150 Hz com harmônicos"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    wave = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    wave *= rms / np.sqrt(np.mean(wave ** 2))
+    return wave.astype(np.int16)
+
+class FakeStream:
+    def __init__(self, samples):
+        self.data = samples.tobytes()
+        self.position = 0
+    
+    def read(self, frames):
+        chunk = self.data[self.position:self.position + frames * 2]
+        self.position += frames * 2
+        return chunk
+
+class FakeSource:
+    CHUNK = CHUNK
+    SAMPLE_RATE = RATE
+    SAMPLE_WIDTH = 2
+    
+    def __init__(self, *segments):
+        self.stream = FakeStream(np.concatenate(segments))
+
+def listen(*segments):
+    listener = ContinuousListener(microphone=None)
+    listener.source = FakeSource(*segments)
+    return listener, list(listener.phrases())
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(7)
+
+def test_detects_phrase_in_quiet_room(rng):
+    listener, phrases = listen(noise(2, 30, rng), speech(1.5, 3000), noise(2, 30, rng))
+    assert len(phrases) == 1
+    assert listener.energy_threshold == listener.min_threshold
+
+def test_learns_step_increase_in_noise(rng):
+    listener, phrases = listen(noise(3, 30, rng), noise(12, 500, rng))
+    assert phrases == []
+    assert listener.noise_floor == pytest.approx(500, rel=0.2)
+    assert listener.energy_threshold > 500
+
+def test_learns_noise_on_loud_start(rng):
+    listener, phrases = listen(noise(12, 500, rng))
+    assert phrases == []
+    assert listener.noise_floor == pytest.approx(500, rel=0.2)
+
+def test_detects_phrase_after_noise_step(rng):
+    listener, phrases = listen(noise(3, 30, rng), noise(6, 500, rng),
+                               speech(1.5, 4000), noise(2, 500, rng))
+    assert len(phrases) == 1
+    assert len(phrases[0].frame_data) >= 1.5 * RATE * 2
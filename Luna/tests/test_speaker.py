@@ -0,0 +1,66 @@
+import threading
+import pytest
+import numpy as np
+
+from audio_module import voice_embedding, float_to_pcm16
+from recognition_module import RecognitionSystem
+from fixtures.make_wake_word import word, SAMPLE_RATE
+
+WORDS = ['luna', 'kasa', 'oiei', 'salu', 'nekoi', 'lunakasa']
+
+def utterance(f0, i):
+    """Mesma voz (f0 com variação de 3%) dizendo palavras diferentes"""
+    return word(WORDS[i % len(WORDS)], speed=[0.9, 1.0, 1.1][i % 3], f0=f0 * [0.97, 1.0, 1.03][i % 3],
+                gain=[0.3, 0.5, 0.8][i % 3], seed=i)
+
+@pytest.fixture
+def recognition(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    system = RecognitionSystem()
+    yield system
+    system.close()
+
+def similarities(a, b):
+    return [float(x @ y) for x in a for y in b]
+
+def test_voice_embedding_separates_pitch(recognition):
+    threshold = recognition.voice_match_threshold
+    low = [voice_embedding(utterance(120, i), SAMPLE_RATE) for i in range(6)]
+    high = [voice_embedding(utterance(220, i + 6), SAMPLE_RATE) for i in range(6)]
+    
+    assert max(similarities(low, high)) < threshold
+    for voice in (low, high):
+        same = [float(x @ y) for i, x in enumerate(voice) for y in voice[i + 1:]]
+        assert min(same) >= threshold
+
+def test_voice_embedding_is_unit_length():
+    embedding = voice_embedding(utterance(180, 0), SAMPLE_RATE)
+    assert embedding.dtype == np.float32
+    assert np.linalg.norm(embedding) == pytest.approx(1.0, abs=1e-5)
+
+def test_analyze_voice_pattern_groups_speakers(recognition):
+    low = {recognition.analyze_voice_pattern(float_to_pcm16(utterance(120, i))) for i in range(4)}
+    high = {recognition.analyze_voice_pattern(float_to_pcm16(utterance(220, i + 6))) for i in range(4)}
+    
+    assert len(low) == 1 and len(high) == 1
+    assert low != high
+    assert len(recognition.get_voice_index()) == 2
+
+def test_concurrent_phrases_of_new_speaker_share_profile(recognition):
+    phrases = [float_to_pcm16(utterance(150, i)) for i in range(6)]
+    barrier = threading.Barrier(len(phrases))
+    results = []
+    
+    def analyze(audio):
+        barrier.wait()
+        results.append(recognition.analyze_voice_pattern(audio))
+    
+    threads = [threading.Thread(target=analyze, args=(audio,)) for audio in phrases]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    
+    assert len(results) == len(phrases)
+    assert len(set(results)) == 1
+    assert len(recognition.get_voice_index()) == 1
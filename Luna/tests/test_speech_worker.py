@@ -0,0 +1,91 @@
+import threading
+import pytest
+
+pytest.importorskip('pyttsx3')
+pytest.importorskip('pyaudio')
+
+from voice_module import SpeechWorker, PRIORITY_USER, PRIORITY_SYSTEM
+
+class FakeEngine:
+    """Engine que "fala" até stop() ou até o teste liberar"""
+    
+    def __init__(self):
+        self.properties = {'voice': 'fake'}
+        self.queued = []
+        self.started = []
+        self.finished = []
+        self.stopped = []
+        self.speaking = threading.Event()
+        self.ended = threading.Event()
+        self.outcome = None
+    
+    def getProperty(self, name):
+        return self.properties.get(name)
+    
+    def setProperty(self, name, value):
+        self.properties[name] = value
+    
+    def say(self, text):
+        self.queued.append(text)
+    
+    def runAndWait(self):
+        text = self.queued.pop(0)
+        self.started.append(text)
+        self.speaking.set()
+        self.ended.wait(2.0)
+        self.speaking.clear()
+        self.ended.clear()
+        (self.stopped if self.outcome == 'stopped' else self.finished).append(text)
+    
+    def end(self, outcome='finished'):
+        self.outcome = outcome
+        self.ended.set()
+    
+    def stop(self):
+        self.end('stopped')
+
+@pytest.fixture
+def engine():
+    return FakeEngine()
+
+@pytest.fixture
+def worker(engine):
+    worker = SpeechWorker(engine)
+    worker.start()
+    yield worker
+    engine.end()
+    worker.stop()
+    worker.thread.join(5)
+
+def test_user_reply_preempts_notification(worker, engine):
+    notification = worker.say("Dispositivo USB conectado", priority=PRIORITY_SYSTEM)
+    assert engine.speaking.wait(2.0)
+    queued = worker.say("Driver atualizado", priority=PRIORITY_SYSTEM)
+    
+    reply = worker.say("Claro, já estou abrindo", priority=PRIORITY_USER)
+    assert notification.done.wait(1.0), "notificação não foi interrompida"
+    assert queued.cancelled
+    
+    assert engine.speaking.wait(2.0)
+    engine.end()
+    assert reply.done.wait(2.0)
+    
+    assert engine.stopped == ["Dispositivo USB conectado"]
+    assert engine.finished == ["Claro, já estou abrindo"]
+    assert engine.started == ["Dispositivo USB conectado", "Claro, já estou abrindo"]
+    assert worker.get_metrics()['preempted'] == 1
+
+def test_notification_waits_for_user_reply(worker, engine):
+    reply = worker.say("Claro, já estou abrindo", priority=PRIORITY_USER)
+    assert engine.speaking.wait(2.0)
+    notification = worker.say("Dispositivo USB conectado", priority=PRIORITY_SYSTEM)
+    assert not notification.cancelled
+    assert not reply.cancelled
+    
+    engine.end()
+    assert reply.done.wait(2.0)
+    assert engine.speaking.wait(2.0)
+    engine.end()
+    assert notification.done.wait(2.0)
+    assert engine.started == ["Claro, já estou abrindo", "Dispositivo USB conectado"]
+    assert worker.get_metrics()['preempted'] == 0
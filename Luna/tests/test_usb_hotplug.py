@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+import threading
+import pytest
+
+from usb_hotplug_module import UsbHotplugMonitor, read_usb_devices
+
+def add_device(sysfs, name, vendor='046d', product_id='c52b', manufacturer='Logitech', product='USB Receiver'):
+    path = sysfs / 'bus' / 'usb' / 'devices' / name
+    path.mkdir(parents=True)
+    attributes = {'idVendor': vendor, 'idProduct': product_id, 'manufacturer': manufacturer, 'product': product}
+    for attribute, value in attributes.items():
+        if value is not None:
+            (path / attribute).write_text(value + '\n')
+    return path
+
+def remove_device(path):
+    for child in path.iterdir():
+        child.unlink()
+    path.rmdir()
+
+@pytest.fixture
+def sysfs(tmp_path):
+    (tmp_path / 'bus' / 'usb' / 'devices').mkdir(parents=True)
+    return tmp_path
+
+def test_read_usb_devices(sysfs):
+    add_device(sysfs, '1-1')
+    add_device(sysfs, '1-2', vendor='0781', product_id='5567', manufacturer=None, product=None)
+    add_device(sysfs, '1-1:1.0', manufacturer=None, product=None)  # Interface, não dispositivo
+    (sysfs / 'bus' / 'usb' / 'devices' / '1-3').mkdir()  # Ainda sem atributos
+    
+    devices = read_usb_devices(str(sysfs))
+    assert sorted(devices) == ['1-1', '1-2']
+    assert devices['1-1']['description'] == 'Logitech USB Receiver'
+    assert devices['1-1']['vendor_id'] == '046d'
+    assert devices['1-2']['description'] == 'USB 0781:5567'
+
+def test_read_usb_devices_without_bus(tmp_path):
+    assert read_usb_devices(str(tmp_path)) == {}
+
+def test_rescan_reports_added_and_removed(sysfs):
+    events = []
+    monitor = UsbHotplugMonitor(lambda event, device: events.append((event, device['id'])), str(sysfs))
+    keyboard = add_device(sysfs, '1-1')
+    monitor.devices = read_usb_devices(str(sysfs))
+    
+    add_device(sysfs, '1-2')
+    monitor.rescan()
+    assert events == [('usb_connected', '1-2')]
+    
+    remove_device(keyboard)
+    monitor.rescan()
+    assert events == [('usb_connected', '1-2'), ('usb_disconnected', '1-1')]
+    assert sorted(monitor.devices) == ['1-2']
+
+def open_fds():
+    return len(os.listdir('/proc/self/fd'))
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason="requer /proc")
+def test_monitor_without_run_holds_no_fds(sysfs):
+    before = open_fds()
+    monitor = UsbHotplugMonitor(lambda *args: None, str(sysfs))
+    monitor.stop()
+    monitor.run()  # Já parado: volta na hora, sem abrir nada
+    assert open_fds() == before
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="inotify só no Linux")
+def test_run_detects_hotplug_and_stops(sysfs):
+    events = []
+    changed = threading.Event()
+    
+    def on_change(event, device):
+        events.append((event, device['id']))
+        changed.set()
+    
+    before = open_fds()
+    monitor = UsbHotplugMonitor(on_change, str(sysfs))
+    thread = threading.Thread(target=monitor.run, kwargs={'initial': {}}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 2
+    while monitor.source is None:
+        if time.monotonic() > deadline:
+            monitor.stop()
+            pytest.fail("monitor não abriu a fonte de eventos em 2 s")
+        time.sleep(0.01)
+    
+    # inotify vê o diretório surgir; os atributos já estão lá ao reler
+    staging = add_device(sysfs / 'staging', '1-4')
+    os.rename(staging, sysfs / 'bus' / 'usb' / 'devices' / '1-4')
+    assert changed.wait(2)
+    assert events == [('usb_connected', '1-4')]
+    assert monitor.get_stats()['backend'] == 'inotify'
+    
+    monitor.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert open_fds() == before
@@ -0,0 +1,47 @@
+import os
+import glob
+import types
+import pytest
+import numpy as np
+
+from audio_module import WakeWordDetector, log_mel_features, read_wav, float_to_pcm16
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'wake_word')
+THRESHOLD = 0.6
+
+def fixtures(kind):
+    return sorted(glob.glob(os.path.join(FIXTURES, kind, '*.wav')))
+
+@pytest.fixture
+def detector():
+    return WakeWordDetector(template_dir=os.path.join(FIXTURES, 'templates'), threshold=THRESHOLD)
+
+def test_log_mel_features_shape():
+    samples, rate = read_wav(fixtures('positive')[0])
+    features = log_mel_features(samples, rate, n_mels=26)
+    # Quadros de 25 ms a cada 10 ms
+    assert features.shape == (1 + (len(samples) - 400) // 160, 26)
+    assert features.dtype == np.float32
+
+@pytest.mark.parametrize('path', fixtures('positive'), ids=os.path.basename)
+def test_detects_wake_word(detector, path):
+    samples, rate = read_wav(path)
+    assert detector.score(samples, rate) >= THRESHOLD
+    assert detector.detect_wav(path)
+
+@pytest.mark.parametrize('path', fixtures('negative'), ids=os.path.basename)
+def test_rejects_other_audio(detector, path):
+    samples, rate = read_wav(path)
+    assert detector.score(samples, rate) < THRESHOLD
+    assert not detector.detect_wav(path)
+
+def test_detect_audio_data(detector):
+    samples, rate = read_wav(fixtures('positive')[0])
+    audio = types.SimpleNamespace(frame_data=float_to_pcm16(samples), sample_rate=rate, sample_width=2)
+    assert detector.detect(audio)
+    assert detector.get_stats()['passed'] == 1
+
+def test_without_templates_lets_everything_through(tmp_path):
+    detector = WakeWordDetector(template_dir=str(tmp_path))
+    assert not detector.ready
+    assert detector.detect_wav(fixtures('negative')[0])